@@ -5,13 +5,34 @@ Application Configuration
 Configuration settings, constants, and environment variables for the application.
 """
 
+import logging
 import os
-from typing import List
+import shutil
+import tempfile
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Any, Dict, Final, List, Mapping
 
 
-class Settings:
+class _SingletonMeta(type):
+    """Metaclass that hands out a single shared instance per class."""
+    
+    _instances: Dict[type, Any] = {}
+    
+    def __call__(cls, *args, **kwargs):
+        instance = _SingletonMeta._instances.get(cls)
+        if instance is None:
+            instance = super().__call__(*args, **kwargs)
+            _SingletonMeta._instances[cls] = instance
+        return instance
+
+
+class Settings(metaclass=_SingletonMeta):
     """Application settings and configuration."""
     
+    # Hot-read values live in slots on the single instance
+    __slots__ = ("CACHE_TTL", "CHUNK_SIZE", "LOG_LEVEL", "LOG_LEVEL_INT")
+    
     # Application Info
     APP_NAME = "YouTube Downloader API"
     VERSION = "2.0.0"
@@ -37,20 +58,25 @@ class Settings:
     CORS_ALLOW_HEADERS = ["*"]
     
     # Cache Configuration
-    CACHE_TTL = 300  # 5 minutes
     CACHE_MAX_SIZE = 1000  # Maximum number of cached items
     
     # Performance Configuration
     MAX_CONCURRENT_DOWNLOADS = 2  # Parallel download threads
+    MAX_YT_WORKERS = 8  # Worker threads for blocking pytubefix/FFmpeg calls
+    MAX_YT_INFLIGHT = 32  # Blocking calls allowed running or queued at once
+    FILESIZE_PREFETCH_WORKERS = 8  # Threads resolving stream sizes (HTTP HEADs) in parallel
+    DOWNLOAD_SEGMENTS = 8  # Parallel HTTP range requests per stream download
+    MIN_SEGMENT_SIZE = 1024 * 1024  # Don't split streams into ranges smaller than 1MB
     DOWNLOAD_TIMEOUT = 300  # 5 minutes
-    CHUNK_SIZE = 8192  # 8KB chunks for streaming
+    FFMPEG_CONCURRENCY = int(os.getenv("FFMPEG_CONCURRENCY", max(1, (os.cpu_count() or 2) // 2)))  # Concurrent FFmpeg merges
     
     # File Configuration
     MAX_FILENAME_LENGTH = 50
     TEMP_DIR_PREFIX = "ytdl_merge_"
+    TMPFS_ROOT = "/dev/shm"  # RAM-backed filesystem on Linux
+    TMPFS_MIN_FREE_BYTES = 1024 * 1024 * 1024  # Don't use tmpfs below 1GB free (e.g. Docker's 64MB /dev/shm)
     
     # Logging Configuration
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
     # External Services
@@ -61,89 +87,245 @@ class Settings:
     ENABLE_PARALLEL_DOWNLOADS = True
     ENABLE_FFMPEG_MERGING = True
     
+    def __init__(self):
+        """Initialize the slotted, frequently read settings."""
+        self.CACHE_TTL = 300  # 5 minutes
+        self.CHUNK_SIZE = 1024 * 1024  # 1MB chunks for file streaming (fewer reads/thread hops per video)
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+        # Numeric level resolved once so logging setup never looks it up by name
+        self.LOG_LEVEL_INT = getattr(logging, self.LOG_LEVEL.upper(), logging.INFO)
+    
+    # Environment-derived values, populated once by refresh()
+    _cors_origins: List[str] = []
+    _environment: str = "development"
+    _port: int = 8000
+    _is_railway: bool = False
+    _temp_root: str = tempfile.gettempdir()
+    _temp_root_created: bool = False
+    
     @classmethod
-    def get_cors_origins(cls) -> List[str]:
-        """Get CORS origins from environment or default."""
+    def refresh(cls) -> None:
+        """
+        Re-read environment-derived settings.
+        
+        Values are parsed once at import time; call this after the environment
+        changes (e.g. after loading a .env file) to pick up the new values.
+        """
         env_origins = os.getenv("CORS_ORIGINS")
         if env_origins:
-            return [origin.strip() for origin in env_origins.split(",")]
-        return cls.CORS_ORIGINS
+            cls._cors_origins = [origin.strip() for origin in env_origins.split(",")]
+        else:
+            cls._cors_origins = list(cls.CORS_ORIGINS)
+        cls._environment = os.getenv("ENVIRONMENT", "development")
+        env_port = os.getenv("PORT")
+        cls._port = int(env_port) if env_port else cls.PORT
+        # Railway/deployment detection: production env, Railway variables or a non-default PORT
+        cls._is_railway = bool(
+            cls._environment == "production" or
+            os.getenv("RAILWAY_ENVIRONMENT") or
+            (env_port and env_port != "8000") or
+            "railway" in os.getenv("HOSTNAME", "").lower()
+        )
+        cls._temp_root = cls._resolve_temp_root()
+        cls._temp_root_created = False
+    
+    @classmethod
+    def _resolve_temp_root(cls) -> str:
+        """
+        Pick the process-wide parent directory for per-request temp directories.
+        
+        Prefers tmpfs (/dev/shm) so downloads and merges stay in RAM, unless
+        USE_TMPFS=false or the mount is missing or too small.
+        """
+        base = tempfile.gettempdir()
+        if os.getenv("USE_TMPFS", "true").lower() == "true" and os.path.isdir(cls.TMPFS_ROOT):
+            try:
+                if shutil.disk_usage(cls.TMPFS_ROOT).free >= cls.TMPFS_MIN_FREE_BYTES:
+                    base = cls.TMPFS_ROOT
+            except OSError:
+                pass
+        
+        return os.path.join(base, "ytdl")
+    
+    @classmethod
+    def get_temp_root(cls) -> str:
+        """
+        Get the shared parent directory for temporary download files.
+        
+        The directory is created on first use rather than at import, so
+        importing the settings has no filesystem side effects.
+        """
+        if not cls._temp_root_created:
+            os.makedirs(cls._temp_root, exist_ok=True)
+            cls._temp_root_created = True
+        return cls._temp_root
+    
+    @classmethod
+    def get_cors_origins(cls) -> List[str]:
+        """Get CORS origins from environment or default."""
+        return cls._cors_origins
+    
+    @classmethod
+    def get_environment(cls) -> str:
+        """Get the deployment environment name."""
+        return cls._environment
+    
+    @classmethod
+    def get_port(cls) -> int:
+        """Get the server port from environment or default."""
+        return cls._port
+    
+    @classmethod
+    def is_railway(cls) -> bool:
+        """Check if running on Railway or another deployed environment."""
+        return cls._is_railway
+    
+    @classmethod
+    def get_server_host(cls) -> str:
+        """Get the bind address: all interfaces when deployed, localhost in development."""
+        return "0.0.0.0" if cls._is_railway else "127.0.0.1"
     
     @classmethod
     def is_development(cls) -> bool:
         """Check if running in development mode."""
-        return os.getenv("ENVIRONMENT", "development") == "development"
+        return cls._environment == "development"
     
     @classmethod
     def is_production(cls) -> bool:
         """Check if running in production mode."""
-        return os.getenv("ENVIRONMENT", "development") == "production"
+        return cls._environment == "production"
 
 
-# Global settings instance
+Settings.refresh()
+
+# Global settings instance (Settings() always returns this same object)
 settings = Settings()
 
 
+# ============================================================================
+# SCORING TABLES
+# ============================================================================
+# Module-level read-only tables: hot callers import these names directly
+# instead of going through the QualityScores/FileSizeEstimates classes.
+
+# Video quality scores
+VIDEO_SCORES: Final[Mapping[int, int]] = MappingProxyType({
+    2160: 1000,  # 4K
+    1440: 800,   # 1440p
+    1080: 600,   # 1080p
+    720: 400,    # 720p
+    480: 200,    # 480p
+})
+
+# Audio quality scores
+AUDIO_SCORES: Final[Mapping[int, int]] = MappingProxyType({
+    320: 300,    # 320kbps
+    256: 250,    # 256kbps
+    192: 200,    # 192kbps
+    128: 150,    # 128kbps
+    96: 100,     # 96kbps
+})
+
+# Codec bonuses
+VIDEO_CODEC_BONUS: Final[Mapping[str, int]] = MappingProxyType({
+    "av01": 30,  # AV1 (most efficient)
+    "vp9": 20,   # VP9 (good efficiency)
+    "h264": 10,  # H.264 (standard)
+})
+
+AUDIO_CODEC_BONUS: Final[Mapping[str, int]] = MappingProxyType({
+    "opus": 25,  # Opus (most efficient)
+    "aac": 20,   # AAC (good quality)
+    "mp3": 10,   # MP3 (compatible)
+})
+
+# FPS bonuses
+FPS_BONUS: Final[Mapping[int, int]] = MappingProxyType({
+    60: 50,      # 60fps
+    30: 25,      # 30fps
+})
+
+# Bytes -> MB conversion factor (multiply instead of dividing per stream)
+MB_PER_BYTE: Final[float] = 1 / (1024 * 1024)
+
+# Bitrate estimates by resolution (kbps)
+VIDEO_BITRATES: Final[Mapping[int, int]] = MappingProxyType({
+    2160: 3500,  # 4K
+    1440: 2500,  # 1440p
+    1080: 2000,  # 1080p
+    720: 1500,   # 720p
+    480: 800,    # 480p
+    360: 500,    # 360p
+    240: 300,    # 240p
+})
+
+
 # Quality scoring constants
 class QualityScores:
     """Quality scoring constants for stream selection."""
     
-    # Video quality scores
-    VIDEO_SCORES = {
-        2160: 1000,  # 4K
-        1440: 800,   # 1440p
-        1080: 600,   # 1080p
-        720: 400,    # 720p
-        480: 200,    # 480p
-    }
-    
-    # Audio quality scores
-    AUDIO_SCORES = {
-        320: 300,    # 320kbps
-        256: 250,    # 256kbps
-        192: 200,    # 192kbps
-        128: 150,    # 128kbps
-        96: 100,     # 96kbps
-    }
-    
-    # Codec bonuses
-    VIDEO_CODEC_BONUS = {
-        "av01": 30,  # AV1 (most efficient)
-        "vp9": 20,   # VP9 (good efficiency)
-        "h264": 10,  # H.264 (standard)
-    }
-    
-    AUDIO_CODEC_BONUS = {
-        "opus": 25,  # Opus (most efficient)
-        "aac": 20,   # AAC (good quality)
-        "mp3": 10,   # MP3 (compatible)
-    }
-    
-    # FPS bonuses
-    FPS_BONUS = {
-        60: 50,      # 60fps
-        30: 25,      # 30fps
-    }
+    # Aliases of the module-level tables, kept for backward compatibility
+    VIDEO_SCORES = VIDEO_SCORES
+    AUDIO_SCORES = AUDIO_SCORES
+    VIDEO_CODEC_BONUS = VIDEO_CODEC_BONUS
+    AUDIO_CODEC_BONUS = AUDIO_CODEC_BONUS
+    FPS_BONUS = FPS_BONUS
+    
+    # Presorted (threshold, score) tables for bisect lookups
+    _VIDEO_THRESHOLDS = tuple(sorted(VIDEO_SCORES))
+    _VIDEO_THRESHOLD_SCORES = tuple(map(VIDEO_SCORES.get, _VIDEO_THRESHOLDS))
+    _AUDIO_THRESHOLDS = tuple(sorted(AUDIO_SCORES))
+    _AUDIO_THRESHOLD_SCORES = tuple(map(AUDIO_SCORES.get, _AUDIO_THRESHOLDS))
+    
+    @classmethod
+    def video_score_for(cls, resolution: int) -> int:
+        """
+        Score a numeric resolution by snapping it to its scoring bucket.
+        
+        Resolutions below the lowest bucket score ``resolution // 10``.
+        """
+        index = bisect_right(cls._VIDEO_THRESHOLDS, resolution) - 1
+        if index < 0:
+            return resolution // 10
+        return cls._VIDEO_THRESHOLD_SCORES[index]
+    
+    @classmethod
+    def audio_score_for(cls, bitrate: int) -> int:
+        """
+        Score a numeric audio bitrate (kbps) by snapping it to its scoring bucket.
+        
+        Bitrates below the lowest bucket score the bitrate itself.
+        """
+        index = bisect_right(cls._AUDIO_THRESHOLDS, bitrate) - 1
+        if index < 0:
+            return bitrate
+        return cls._AUDIO_THRESHOLD_SCORES[index]
 
 
 # File size estimation constants
 class FileSizeEstimates:
     """File size estimation constants."""
     
-    # Bitrate estimates by resolution (kbps)
-    VIDEO_BITRATES = {
-        2160: 3500,  # 4K
-        1440: 2500,  # 1440p
-        1080: 2000,  # 1080p
-        720: 1500,   # 720p
-        480: 800,    # 480p
-        360: 500,    # 360p
-        240: 300,    # 240p
-    }
+    # Alias of the module-level table, kept for backward compatibility
+    VIDEO_BITRATES = VIDEO_BITRATES
+    
+    # Presorted (resolution, bitrate) table for bisect lookups
+    _BITRATE_THRESHOLDS = tuple(sorted(VIDEO_BITRATES))
+    _BITRATE_VALUES = tuple(map(VIDEO_BITRATES.get, _BITRATE_THRESHOLDS))
     
     # Default audio bitrate (kbps)
     DEFAULT_AUDIO_BITRATE = 128
     
     # Compression ratios
     PROGRESSIVE_COMPRESSION = 0.8  # Progressive streams are more compressed
-    ADAPTIVE_COMPRESSION = 1.0     # Adaptive streams are less compressed
\ No newline at end of file
+    ADAPTIVE_COMPRESSION = 1.0     # Adaptive streams are less compressed
+    
+    @classmethod
+    def video_bitrate_for(cls, resolution: int) -> int:
+        """
+        Estimate the video bitrate (kbps) for a numeric resolution.
+        
+        Resolutions below the lowest bucket use the lowest bucket's bitrate.
+        """
+        index = max(bisect_right(cls._BITRATE_THRESHOLDS, resolution) - 1, 0)
+        return cls._BITRATE_VALUES[index]
@@ -6,123 +6,173 @@ Custom exceptions for the YouTube Downloader API with proper error handling
 and user-friendly error messages.
 """
 
-from typing import Optional
+from typing import Dict, Optional
+
+# Closed set of application error codes and the HTTP status each maps to.
+# Handlers translate errors with a single lookup on exc.error_code.
+ERROR_HTTP_STATUS: Dict[str, int] = {
+    "GENERIC_ERROR": 500,
+    "VIDEO_NOT_FOUND": 404,
+    "INVALID_URL": 400,
+    "STREAM_NOT_FOUND": 404,
+    "FFMPEG_ERROR": 500,
+    "FFMPEG_NOT_FOUND": 500,
+    "DOWNLOAD_ERROR": 500,
+    "MERGE_ERROR": 500,
+    "CACHE_ERROR": 500,
+    "CONFIGURATION_ERROR": 500,
+    "SERVICE_UNAVAILABLE": 503,
+    "TIMEOUT_ERROR": 504,
+    "VALIDATION_ERROR": 400,
+}
+
+
+def http_status_for(error: "YouTubeDownloaderError") -> int:
+    """Get the HTTP status code for an application error (500 if unknown)."""
+    return ERROR_HTTP_STATUS.get(error.error_code, 500)
 
 
 class YouTubeDownloaderError(Exception):
     """Base exception class for all YouTube Downloader errors."""
     
+    # Default error code; subclasses override it as a class attribute
+    error_code = "GENERIC_ERROR"
+    
+    # Expected, user-caused errors set this; the API handler then logs them without a traceback
+    FAST_PATH = False
+    
     def __init__(self, message: str, error_code: str = None):
         self.message = message
-        self.error_code = error_code or "GENERIC_ERROR"
-        super().__init__(self.message)
+        if error_code is not None:
+            self.error_code = error_code
+        super().__init__(message)
 
 
 class VideoNotFoundError(YouTubeDownloaderError):
     """Raised when a YouTube video cannot be found or accessed."""
     
+    error_code = "VIDEO_NOT_FOUND"
+    
+    FAST_PATH = True
+    
     def __init__(self, url: str, message: str = None):
         self.url = url
-        message = message or f"Video not found or unavailable: {url}"
-        super().__init__(message, "VIDEO_NOT_FOUND")
+        super().__init__(message or f"Video not found or unavailable: {url}")
 
 
 class InvalidURLError(YouTubeDownloaderError):
     """Raised when an invalid URL is provided."""
     
+    error_code = "INVALID_URL"
+    
+    FAST_PATH = True
+    
     def __init__(self, url: str, message: str = None):
         self.url = url
-        message = message or f"Invalid YouTube URL: {url}"
-        super().__init__(message, "INVALID_URL")
+        super().__init__(message or f"Invalid YouTube URL: {url}")
 
 
 class StreamNotFoundError(YouTubeDownloaderError):
     """Raised when a requested stream is not available."""
     
+    error_code = "STREAM_NOT_FOUND"
+    
+    FAST_PATH = True
+    
     def __init__(self, stream_id: str, message: str = None):
         self.stream_id = stream_id
-        message = message or f"Stream not found: {stream_id}"
-        super().__init__(message, "STREAM_NOT_FOUND")
+        super().__init__(message or f"Stream not found: {stream_id}")
 
 
 class FFmpegError(YouTubeDownloaderError):
     """Raised when FFmpeg operations fail."""
     
+    error_code = "FFMPEG_ERROR"
+    
     def __init__(self, message: str = None, command: str = None):
         self.command = command
-        message = message or "FFmpeg operation failed"
-        super().__init__(message, "FFMPEG_ERROR")
+        super().__init__(message or "FFmpeg operation failed")
 
 
 class FFmpegNotFoundError(YouTubeDownloaderError):
     """Raised when FFmpeg is not available on the system."""
     
+    error_code = "FFMPEG_NOT_FOUND"
+    
     def __init__(self, message: str = None):
-        message = message or "FFmpeg is not installed or not found in PATH"
-        super().__init__(message, "FFMPEG_NOT_FOUND")
+        super().__init__(message or "FFmpeg is not installed or not found in PATH")
 
 
 class DownloadError(YouTubeDownloaderError):
     """Raised when video download fails."""
     
+    error_code = "DOWNLOAD_ERROR"
+    
     def __init__(self, message: str = None, url: str = None):
         self.url = url
-        message = message or "Download failed"
-        super().__init__(message, "DOWNLOAD_ERROR")
+        super().__init__(message or "Download failed")
 
 
 class MergeError(YouTubeDownloaderError):
     """Raised when video/audio merging fails."""
     
+    error_code = "MERGE_ERROR"
+    
     def __init__(self, message: str = None, video_file: str = None, audio_file: str = None):
         self.video_file = video_file
         self.audio_file = audio_file
-        message = message or "Failed to merge video and audio"
-        super().__init__(message, "MERGE_ERROR")
+        super().__init__(message or "Failed to merge video and audio")
 
 
 class CacheError(YouTubeDownloaderError):
     """Raised when cache operations fail."""
     
+    error_code = "CACHE_ERROR"
+    
     def __init__(self, message: str = None, operation: str = None):
         self.operation = operation
-        message = message or "Cache operation failed"
-        super().__init__(message, "CACHE_ERROR")
+        super().__init__(message or "Cache operation failed")
 
 
 class ConfigurationError(YouTubeDownloaderError):
     """Raised when configuration is invalid or missing."""
     
+    error_code = "CONFIGURATION_ERROR"
+    
     def __init__(self, message: str = None, config_key: str = None):
         self.config_key = config_key
-        message = message or "Configuration error"
-        super().__init__(message, "CONFIGURATION_ERROR")
+        super().__init__(message or "Configuration error")
 
 
 class ServiceUnavailableError(YouTubeDownloaderError):
     """Raised when an external service is unavailable."""
     
+    error_code = "SERVICE_UNAVAILABLE"
+    
     def __init__(self, service: str, message: str = None):
         self.service = service
-        message = message or f"Service unavailable: {service}"
-        super().__init__(message, "SERVICE_UNAVAILABLE")
+        super().__init__(message or f"Service unavailable: {service}")
 
 
 class TimeoutError(YouTubeDownloaderError):
     """Raised when operations timeout."""
     
+    error_code = "TIMEOUT_ERROR"
+    
     def __init__(self, operation: str, timeout: int, message: str = None):
         self.operation = operation
         self.timeout = timeout
-        message = message or f"Operation '{operation}' timed out after {timeout} seconds"
-        super().__init__(message, "TIMEOUT_ERROR")
+        super().__init__(message or f"Operation '{operation}' timed out after {timeout} seconds")
 
 
 class ValidationError(YouTubeDownloaderError):
     """Raised when input validation fails."""
     
+    error_code = "VALIDATION_ERROR"
+    
+    FAST_PATH = True
+    
     def __init__(self, field: str, value: str = None, message: str = None):
         self.field = field
         self.value = value
-        message = message or f"Validation failed for field: {field}"
-        super().__init__(message, "VALIDATION_ERROR")
\ No newline at end of file
+        super().__init__(message or f"Validation failed for field: {field}")
\ No newline at end of file
@@ -6,8 +6,68 @@ Data models for request/response validation and API documentation.
 All models include comprehensive examples and validation rules.
 """
 
+import re
 from typing import List, Optional
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+
+# HTTP/HTTPS YouTube video URL, compiled once at import. Group 1 captures the
+# 11-character video ID so one match both validates the URL and yields the ID.
+YOUTUBE_URL_PATTERN = re.compile(
+    r"^https?://(?:(?:www|m|music)\.)?"
+    r"(?:youtube\.com/(?:watch\?(?:\S*?&)?v=|shorts/|embed/|live/|v/)|youtu\.be/)"
+    r"([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])\S*$",
+    re.IGNORECASE
+)
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Extract the video ID from a YouTube URL without touching PyTubeFix.
+    
+    Args:
+        url: YouTube video URL
+        
+    Returns:
+        11-character video ID, or None if the URL is not a YouTube video URL
+    """
+    match = YOUTUBE_URL_PATTERN.match(url)
+    return match.group(1) if match else None
+
+
+def canonical_youtube_url(video_id: str) -> str:
+    """
+    Build the canonical watch URL for a video ID.
+    
+    Args:
+        video_id: 11-character YouTube video ID
+        
+    Returns:
+        URL in the form https://www.youtube.com/watch?v=<id>
+    """
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def validate_youtube_url(value: str) -> str:
+    """
+    Validate a YouTube video URL and canonicalize it.
+    
+    Every accepted form (youtu.be, shorts, embed, mobile, extra query
+    parameters) is rewritten to the canonical watch URL, so downstream caches
+    and PyTubeFix always see a single identity per video.
+    
+    Args:
+        value: Raw URL string from the request body
+        
+    Returns:
+        Canonical watch URL for the video
+        
+    Raises:
+        ValueError: If the value is not a YouTube video URL
+    """
+    match = YOUTUBE_URL_PATTERN.match(value.strip())
+    if not match:
+        raise ValueError("URL must be a valid HTTP/HTTPS YouTube video URL")
+    return canonical_youtube_url(match.group(1))
 
 
 class VideoURL(BaseModel):
@@ -17,14 +77,21 @@ class VideoURL(BaseModel):
     Attributes:
         url: Valid HTTP/HTTPS YouTube URL
     """
-    url: HttpUrl
+    url: str
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
             }
         }
+    )
+    
+    @field_validator('url')
+    @classmethod
+    def validate_url(cls, value: str) -> str:
+        """Validate and canonicalize the URL with the precompiled YouTube URL pattern."""
+        return validate_youtube_url(value)
 
 
 class StreamInfo(BaseModel):
@@ -48,8 +115,8 @@ class StreamInfo(BaseModel):
     codec: str
     url: str
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "22",
                 "type": "video",
@@ -60,6 +127,11 @@ class StreamInfo(BaseModel):
                 "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
             }
         }
+    )
+
+
+# Validates a whole list of stream dicts in one pydantic-core call
+STREAM_INFO_LIST_ADAPTER = TypeAdapter(List[StreamInfo])
 
 
 class VideoMetadata(BaseModel):
@@ -81,8 +153,8 @@ class VideoMetadata(BaseModel):
     view_count: int
     streams: List[StreamInfo]
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "title": "Rick Astley - Never Gonna Give You Up",
                 "duration": 212,
@@ -92,6 +164,7 @@ class VideoMetadata(BaseModel):
                 "streams": []
             }
         }
+    )
 
 
 class DownloadRequest(BaseModel):
@@ -102,16 +175,23 @@ class DownloadRequest(BaseModel):
         video_url: YouTube video URL
         stream_id: Specific stream ID to download
     """
-    video_url: HttpUrl
+    video_url: str
     stream_id: str
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "video_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
                 "stream_id": "22"
             }
         }
+    )
+    
+    @field_validator('video_url')
+    @classmethod
+    def validate_video_url(cls, value: str) -> str:
+        """Validate and canonicalize the URL with the precompiled YouTube URL pattern."""
+        return validate_youtube_url(value)
 
 
 class SmartDownloadRequest(BaseModel):
@@ -123,16 +203,23 @@ class SmartDownloadRequest(BaseModel):
         prefer_progressive: Whether to prefer progressive streams over merging
                           (False = prioritize highest quality with merging)
     """
-    video_url: HttpUrl
+    video_url: str
     prefer_progressive: bool = False  # Default to highest quality merging
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "video_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
                 "prefer_progressive": False
             }
         }
+    )
+    
+    @field_validator('video_url')
+    @classmethod
+    def validate_video_url(cls, value: str) -> str:
+        """Validate and canonicalize the URL with the precompiled YouTube URL pattern."""
+        return validate_youtube_url(value)
 
 
 class SmartDownloadInfo(BaseModel):
@@ -156,8 +243,8 @@ class SmartDownloadInfo(BaseModel):
     download_type: str  # 'progressive' or 'merge'
     ffmpeg_available: bool
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "video_title": "Rick Astley - Never Gonna Give You Up",
                 "video_duration": 212,
@@ -168,6 +255,7 @@ class SmartDownloadInfo(BaseModel):
                 "ffmpeg_available": True
             }
         }
+    )
 
 
 class SystemInfo(BaseModel):
@@ -183,14 +271,15 @@ class SystemInfo(BaseModel):
     ffmpeg_version: Optional[str]
     smart_download_supported: bool
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "ffmpeg_available": True,
                 "ffmpeg_version": "ffmpeg version 7.1-essentials_build",
                 "smart_download_supported": True
             }
         }
+    )
 
 
 class ContactRequest(BaseModel):
@@ -204,8 +293,8 @@ class ContactRequest(BaseModel):
     honeypot: Optional[str] = None
     formStartTimestamp: Optional[float] = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Jane Doe",
                 "email": "jane@example.com",
@@ -215,6 +304,7 @@ class ContactRequest(BaseModel):
                 "formStartTimestamp": 1710000000.0
             }
         }
+    )
 
 
 class ContactResponse(BaseModel):
@@ -20,38 +20,64 @@ License: MIT
 
 # Standard library imports
 import asyncio
+import hashlib
 import logging
+import math
 import os
+import secrets
 import tempfile
 import time
+import weakref
+from collections import OrderedDict, deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, Mapping, Optional, Set, TypeVar
+from urllib.parse import quote
 
 # Third-party imports
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, Response, StreamingResponse
 import httpx
-import re
+import minijinja
+import orjson
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.middleware.gzip import GZipMiddleware
+
+# Brotli response compression is optional; gzip is used when unavailable
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 # Local module imports
 from app.config import settings
 from app.models import (
-    VideoURL, StreamInfo, VideoMetadata, DownloadRequest,
+    VideoURL, VideoMetadata, DownloadRequest,
     SmartDownloadRequest, SmartDownloadInfo, SystemInfo,
-    ContactRequest, ContactResponse
-)
-from app.exceptions import (
-    VideoNotFoundError, InvalidURLError, StreamNotFoundError,
-    DownloadError, FFmpegNotFoundError, MergeError
+    ContactRequest, ContactResponse, STREAM_INFO_LIST_ADAPTER, extract_video_id
 )
+from app.exceptions import YouTubeDownloaderError, http_status_for
 from services.youtube_service import youtube_service
+from services.async_downloader import async_downloader
 from services.ffmpeg_service import ffmpeg_service
 from services.smart_selection import smart_select_best_option
 from utils.cache import get_video_analysis_cache, cleanup_all_caches
-from utils.helpers import create_temp_directory, cleanup_temp_directory
+from utils.helpers import (
+    CompressionHelper,
+    FileHelper,
+    ValidationHelper,
+    create_temp_directory,
+    cleanup_temp_directory,
+    sweep_stale_files
+)
 
 # ============================================================================
 # APPLICATION CONFIGURATION
@@ -59,6 +85,7 @@ from utils.helpers import create_temp_directory, cleanup_temp_directory
 
 # Load environment variables from .env if present
 load_dotenv()
+settings.refresh()
 
 # Initialize FastAPI application with metadata
 app = FastAPI(
@@ -66,24 +93,153 @@ app = FastAPI(
     version=settings.VERSION,
     description=settings.DESCRIPTION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure logging for debugging and monitoring
 logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
+    level=settings.LOG_LEVEL_INT,
     format=settings.LOG_FORMAT
 )
 logger = logging.getLogger(__name__)
 
 # Debug: Log environment variables for troubleshooting
-logger.info(f"Environment check - HOST: {os.getenv('HOST', 'NOT_SET')}")
-logger.info(f"Environment check - PORT: {os.getenv('PORT', 'NOT_SET')}")
-logger.info(f"Environment check - ENVIRONMENT: {os.getenv('ENVIRONMENT', 'NOT_SET')}")
+logger.info("Environment check - HOST: %s", os.getenv('HOST', 'NOT_SET'))
+logger.info("Environment check - PORT: %s", os.getenv('PORT', 'NOT_SET'))
+logger.info("Environment check - ENVIRONMENT: %s", os.getenv('ENVIRONMENT', 'NOT_SET'))
 
 # Get cache instance
 video_cache = get_video_analysis_cache()
 
+# Shared worker pool for blocking pytubefix/FFmpeg work (created once, reused per request)
+_POOL = ThreadPoolExecutor(
+    max_workers=settings.MAX_YT_WORKERS,
+    thread_name_prefix="ytdl"
+)
+
+# Caps blocking calls in flight (running + queued) so bursts can't swamp the pool
+_BLOCKING_SLOTS = asyncio.Semaphore(settings.MAX_YT_INFLIGHT)
+
+# HTML page templates (Jinja syntax) rendered by the Rust-backed MiniJinja engine;
+# sources are loaded once and kept compiled inside the environment
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+def _load_template(name: str) -> Optional[str]:
+    """Template loader for MiniJinja; returns None for unknown templates."""
+    try:
+        with open(os.path.join(TEMPLATES_DIR, name), encoding="utf-8") as template_file:
+            return template_file.read()
+    except FileNotFoundError:
+        return None
+
+
+_template_env = minijinja.Environment(loader=_load_template)
+
+# Page stylesheets, served from /assets with long-lived caching
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+ASSETS_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles that marks assets immutable; URLs are versioned by content hash."""
+    
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = ASSETS_CACHE_CONTROL
+        return response
+
+
+app.mount("/assets", ImmutableStaticFiles(directory=STATIC_DIR), name="assets")
+
+
+@lru_cache(maxsize=None)
+def asset_url(name: str) -> str:
+    """Versioned /assets URL for a static file, so cached copies never go stale."""
+    with open(os.path.join(STATIC_DIR, name), "rb") as asset_file:
+        digest = hashlib.blake2b(asset_file.read(), digest_size=6).hexdigest()
+    return f"/assets/{name}?v={digest}"
+
+
+@app.on_event("shutdown")
+async def shutdown_worker_pool():
+    """Release the shared worker pool on application shutdown."""
+    _POOL.shutdown(wait=False)
+
+
+@app.on_event("startup")
+async def create_http_client():
+    """Create the shared HTTP client (keep-alive + HTTP/2) used for outbound calls."""
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=settings.DOWNLOAD_TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    )
+
+
+# Single-stream downloads share one scratch directory per worker instead of a
+# directory per request; files are deleted after sending, and the sweeper
+# reclaims any left behind by interrupted requests
+SCRATCH_SWEEP_INTERVAL = 60  # Seconds between sweeps
+SCRATCH_FILE_MAX_AGE = 300  # Seconds without writes before a scratch file is stale
+
+
+async def _sweep_scratch_dir(scratch_dir: str) -> None:
+    """Periodically remove stale files from the scratch directory."""
+    while True:
+        await asyncio.sleep(SCRATCH_SWEEP_INTERVAL)
+        removed = await asyncio.to_thread(sweep_stale_files, scratch_dir, SCRATCH_FILE_MAX_AGE)
+        if removed:
+            logger.info("Swept %d stale scratch files", removed)
+
+
+@app.on_event("startup")
+async def create_scratch_dir():
+    """Create this worker's download scratch directory and start its sweeper."""
+    app.state.scratch_dir = create_temp_directory("ytdl_scratch_")
+    app.state.scratch_sweeper = asyncio.create_task(_sweep_scratch_dir(app.state.scratch_dir))
+
+
+@app.on_event("shutdown")
+async def remove_scratch_dir():
+    """Stop the sweeper and remove the scratch directory."""
+    app.state.scratch_sweeper.cancel()
+    await asyncio.to_thread(cleanup_temp_directory, app.state.scratch_dir)
+
+
+CACHE_SWEEP_INTERVAL = 60  # Seconds between expired cache entry sweeps
+
+
+async def _sweep_caches() -> None:
+    """Periodically drop expired entries from every in-memory cache."""
+    while True:
+        await asyncio.sleep(CACHE_SWEEP_INTERVAL)
+        cleanup_all_caches()
+        youtube_service.cleanup_cache()
+
+
+@app.on_event("startup")
+async def start_cache_sweeper():
+    """Start the background sweep of expired cache entries."""
+    app.state.cache_sweeper = asyncio.create_task(_sweep_caches())
+
+
+@app.on_event("shutdown")
+async def stop_cache_sweeper():
+    """Stop the cache sweeper."""
+    app.state.cache_sweeper.cancel()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the shared HTTP clients and their pooled connections."""
+    # Let queued contact emails finish before their client goes away
+    if _pending_email_tasks:
+        await asyncio.gather(*_pending_email_tasks, return_exceptions=True)
+    await app.state.http.aclose()
+    await async_downloader.aclose()
+
 # ============================================================================
 # CORS CONFIGURATION
 # ============================================================================
@@ -97,439 +253,291 @@ app.add_middleware(
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
+
+# ============================================================================
+# RESPONSE COMPRESSION
+# ============================================================================
+
+# Paths that serve binary downloads or bodies that are already pre-compressed
+UNCOMPRESSED_PATHS = frozenset({"/", "/health", "/api/download", "/api/smart-download"})
+
+
+class SelectiveCompressionMiddleware:
+    """
+    Compress text responses (JSON, /docs, /openapi.json) above a size threshold.
+    
+    Uses Brotli (with gzip fallback) when brotli-asgi is installed, plain gzip
+    otherwise. Download and pre-compressed page paths bypass compression.
+    """
+    
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed_app = BrotliMiddleware(app, quality=4, minimum_size=minimum_size)
+        else:
+            self.compressed_app = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=6)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in UNCOMPRESSED_PATHS:
+            await self.compressed_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(SelectiveCompressionMiddleware, minimum_size=1024)
+
+# ============================================================================
+# EXCEPTION HANDLERS
+# ============================================================================
+
+@app.exception_handler(YouTubeDownloaderError)
+async def youtube_downloader_error_handler(request: Request, exc: YouTubeDownloaderError):
+    """Convert uncaught application errors into JSON error responses."""
+    if exc.FAST_PATH:
+        # Expected client errors: no traceback formatting
+        logger.info("%s: %s", exc.error_code, exc.message)
+    else:
+        logger.error("%s: %s", exc.error_code, exc.message, exc_info=exc)
+    
+    return ORJSONResponse(
+        {"error": exc.error_code, "message": exc.message},
+        status_code=http_status_for(exc)
+    )
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """Render HTTPException bodies with orjson, matching the default response class."""
+    headers = getattr(exc, "headers", None)
+    if exc.status_code in (204, 304) or exc.status_code < 200:
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def get_fast_smart_selection(video_url: str, prefer_progressive: bool = False) -> Optional[Dict[str, Any]]:
-    """Optimized smart selection with caching and lazy loading"""
-    try:
-        # Create YouTube object
-        yt = youtube_service.create_youtube_object(video_url)
-        video_id = yt.video_id
-        
-        # Check cache first
-        cached_data = video_cache.get_analysis(video_id)
-        if cached_data and 'smart_selection' in cached_data:
-            return cached_data['smart_selection']
+# (includes_video_track, includes_audio_track) -> (file extension, media type)
+DOWNLOAD_FILE_TYPES = MappingProxyType({
+    (True, True): ('mp4', 'video/mp4'),
+    (True, False): ('mp4', 'video/mp4'),
+    (False, True): ('mp3', 'audio/mp4'),
+    (False, False): ('mp3', 'application/octet-stream')
+})
+
+
+def attachment_disposition(filename: str) -> str:
+    """
+    Build a Content-Disposition header for a download, as FileResponse does.
+    
+    Args:
+        filename: Suggested download filename (may contain non-ASCII characters)
         
-        # Use the smart selection service
-        smart_selection = smart_select_best_option(yt, prefer_progressive)
+    Returns:
+        Header value, using RFC 5987 encoding when the name needs quoting
+    """
+    quoted_filename = quote(filename)
+    if quoted_filename != filename:
+        return f"attachment; filename*=utf-8''{quoted_filename}"
+    return f'attachment; filename="{filename}"'
+
+
+class DownloadFileResponse(FileResponse):
+    """FileResponse that streams downloads in settings.CHUNK_SIZE reads instead of 64KB."""
+    
+    chunk_size = settings.CHUNK_SIZE
+
+
+def get_fast_smart_selection(video_url: str, prefer_progressive: bool = False) -> Optional[Mapping[str, Any]]:
+    """
+    Optimized smart selection with caching and lazy loading.
+    
+    Selections come from video_cache, which expires them by TTL, and are
+    shared between callers, so they are returned as read-only mappings.
+    """
+    # Validate and extract the video ID with one precompiled regex match
+    video_id = extract_video_id(video_url)
+    if not video_id:
+        logger.error("Fast analysis failed: invalid YouTube URL %s", video_url)
+        return None
+    
+    # Check cache first so cache hits never construct a YouTube object
+    cached_selection = video_cache.get_smart_selection(video_id, prefer_progressive)
+    if cached_selection is not None:
+        return MappingProxyType(cached_selection)
+    
+    # Create YouTube object; unavailable videos are an expected outcome here
+    yt, error_code = youtube_service.try_create_youtube_object(video_url)
+    if error_code:
+        logger.error("Fast analysis failed: %s", error_code)
+        return None
+    
+    # Use the smart selection service (returns None on failure)
+    smart_selection = smart_select_best_option(yt, prefer_progressive)
+    if not smart_selection:
+        return None
+    
+    # Cache the results
+    video_cache.cache_smart_selection(video_id, smart_selection, prefer_progressive)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Fast analysis completed for %s: %s",
+            video_id, smart_selection.get('quality_description', 'No description')
+        )
+    
+    return MappingProxyType(smart_selection)
+
+T = TypeVar("T")
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a blocking call on the shared worker pool without stalling the event loop.
+    
+    Args:
+        func: Blocking callable (pytubefix network access, downloads, FFmpeg)
+        *args: Positional arguments for func
         
-        if smart_selection:
-            # Cache the results
-            video_cache.cache_smart_selection(video_id, smart_selection)
-            logger.info(f"Fast analysis completed for {video_id}: {smart_selection.get('quality_description', 'No description')}")
+    Returns:
+        Whatever func returns; exceptions propagate unchanged
+    """
+    async with _BLOCKING_SLOTS:
+        return await asyncio.get_running_loop().run_in_executor(_POOL, func, *args)
+
+
+# Per-video locks for /api/video-info; entries vanish once no request holds them
+_video_info_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def load_video_info(video_url: str) -> VideoMetadata:
+    """
+    Fetch video metadata and available streams from YouTube.
+    
+    Args:
+        video_url: YouTube video URL
         
-        return smart_selection
+    Returns:
+        VideoMetadata with all available streams
         
-    except Exception as e:
-        logger.error(f"Fast analysis failed: {e}")
-        return None
+    Raises:
+        YouTubeDownloaderError: If the video cannot be loaded
+    """
+    logger.info("Processing video URL: %s", video_url)
+    
+    # Create YouTube object using service
+    yt = youtube_service.create_youtube_object(video_url)
+    
+    # Get metadata and streams using services
+    metadata = youtube_service.get_video_metadata(yt)
+    streams = youtube_service.get_stream_info(yt)
+    
+    # Convert to StreamInfo models in a single validation pass
+    stream_models = STREAM_INFO_LIST_ADAPTER.validate_python(streams)
+    
+    logger.info("Successfully processed video: %s with %s streams", metadata['title'], len(stream_models))
+    
+    # Fields come from trusted service code and validated streams; skip re-validation
+    return VideoMetadata.model_construct(
+        title=metadata['title'],
+        duration=metadata['duration'],
+        thumbnail=metadata['thumbnail'],
+        uploader=metadata['uploader'],
+        view_count=metadata['view_count'],
+        streams=stream_models
+    )
+
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
+@lru_cache(maxsize=1)
+def _render_root_page() -> bytes:
+    """Render the landing page once; it depends only on process-global state."""
+    html_content = _template_env.render_template(
+        "landing.html",
+        stylesheet=asset_url("landing.css"),
+        version=settings.VERSION,
+        ffmpeg=ffmpeg_service.is_available()
+    )
+    return html_content.encode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def _root_page_variants() -> Dict[str, bytes]:
+    """Pre-compressed (identity/gzip/br) variants of the landing page."""
+    return CompressionHelper.compress_variants(_render_root_page())
+
+
+# Browser/CDN caching policies for the pre-rendered HTML pages
+ROOT_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=60"
+HEALTH_CACHE_CONTROL = "public, max-age=5"
+
+
+def _content_etag(body: bytes) -> str:
+    """Strong ETag derived from a hash of the page bytes."""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+@lru_cache(maxsize=1)
+def _root_page_etag() -> str:
+    """ETag of the rendered landing page."""
+    return _content_etag(_render_root_page())
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against a page ETag.
+    
+    Accepts lists, weak validators and the encoding-suffixed tags emitted below;
+    all representations of the same page share one underlying content hash.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate.split("-", 1)[0].rstrip('"') == etag.rstrip('"'):
+            return True
+    return False
+
+
+def _encoded_html_response(
+    request: Request,
+    variants: Dict[str, bytes],
+    etag: str,
+    cache_control: str
+) -> Response:
+    """
+    Serve the pre-compressed variant that best matches the request's Accept-Encoding.
+    
+    Returns 304 Not Modified when the client's If-None-Match matches the page ETag.
+    Encoded variants get an encoding-suffixed ETag so caches never mix representations.
+    """
+    encoding = CompressionHelper.select_encoding(request.headers.get("accept-encoding", ""), variants)
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"',
+        "Vary": "Accept-Encoding"
+    }
+    
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=variants[encoding], media_type="text/html; charset=utf-8", headers=headers)
+
+
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Beautiful landing page matching the system design."""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>YouTube Downloader API</title>
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap" rel="stylesheet">
-        <style>
-            :root {{
-                --youtube-red: #ff0000;
-                --youtube-red-hover: #cc0000;
-                --youtube-dark: #0f0f0f;
-                --youtube-darker: #0a0a0a;
-                --youtube-card: #1c1c1c;
-                --youtube-card-hover: #272727;
-                --youtube-text-primary: #ffffff;
-                --youtube-text-secondary: #aaaaaa;
-                --youtube-border: #303030;
-                --gradient-primary: linear-gradient(135deg, #0f0f0f 0%, #1c1c1c 50%, #272727 100%);
-                --gradient-accent: linear-gradient(135deg, #ff0000 0%, #cc0000 50%, #990000 100%);
-                --glass-bg: rgba(28, 28, 28, 0.8);
-                --glass-border: rgba(255, 255, 255, 0.1);
-            }}
-            
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            
-            body {{
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-                background: var(--gradient-primary);
-                min-height: 100vh;
-                color: var(--youtube-text-primary);
-                overflow-x: hidden;
-                position: relative;
-            }}
-            
-            /* Animated background particles */
-            .bg-animation {{
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                z-index: -1;
-                background: 
-                    radial-gradient(circle at 20% 50%, rgba(255, 0, 0, 0.1) 0%, transparent 50%),
-                    radial-gradient(circle at 80% 20%, rgba(255, 0, 0, 0.05) 0%, transparent 50%),
-                    radial-gradient(circle at 40% 80%, rgba(255, 0, 0, 0.08) 0%, transparent 50%);
-                animation: float 6s ease-in-out infinite;
-            }}
-            
-            @keyframes float {{
-                0%, 100% {{ transform: translateY(0px) rotate(0deg); }}
-                50% {{ transform: translateY(-20px) rotate(2deg); }}
-            }}
-            
-            .container {{
-                max-width: 1200px;
-                margin: 0 auto;
-                padding: 40px 20px;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                min-height: 100vh;
-                justify-content: center;
-            }}
-            
-            .main-card {{
-                background: var(--glass-bg);
-                backdrop-filter: blur(20px);
-                border: 1px solid var(--glass-border);
-                border-radius: 24px;
-                padding: 50px;
-                text-align: center;
-                box-shadow: 
-                    0 20px 40px rgba(0, 0, 0, 0.4),
-                    0 0 0 1px rgba(255, 255, 255, 0.05),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.1);
-                width: 100%;
-                max-width: 800px;
-                position: relative;
-            }}
-            
-            .logo-section {{
-                margin-bottom: 40px;
-            }}
-            
-            .logo {{
-                font-size: 3.5rem;
-                font-weight: 800;
-                margin-bottom: 15px;
-                background: var(--gradient-accent);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                text-shadow: 0 0 30px rgba(255, 0, 0, 0.3);
-                letter-spacing: -0.02em;
-            }}
-            
-            .version-badge {{
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-                background: var(--gradient-accent);
-                color: white;
-                padding: 8px 20px;
-                border-radius: 50px;
-                font-size: 0.9rem;
-                font-weight: 600;
-                box-shadow: 0 4px 15px rgba(255, 0, 0, 0.3);
-                animation: pulse-glow 3s infinite;
-            }}
-            
-            @keyframes pulse-glow {{
-                0%, 100% {{ box-shadow: 0 4px 15px rgba(255, 0, 0, 0.3); }}
-                50% {{ box-shadow: 0 4px 25px rgba(255, 0, 0, 0.5); }}
-            }}
-            
-            .status-indicator {{
-                display: inline-flex;
-                align-items: center;
-                gap: 12px;
-                background: var(--youtube-card);
-                border: 1px solid var(--youtube-border);
-                padding: 15px 25px;
-                border-radius: 15px;
-                margin: 30px 0;
-                font-weight: 500;
-            }}
-            
-            .status-dot {{
-                width: 12px;
-                height: 12px;
-                background: #00ff88;
-                border-radius: 50%;
-                box-shadow: 0 0 10px #00ff88;
-                animation: pulse 2s infinite;
-            }}
-            
-            @keyframes pulse {{
-                0%, 100% {{ transform: scale(1); opacity: 1; }}
-                50% {{ transform: scale(1.2); opacity: 0.8; }}
-            }}
-            
-            .description {{
-                font-size: 1.2rem;
-                color: var(--youtube-text-secondary);
-                line-height: 1.6;
-                margin: 30px 0;
-                max-width: 600px;
-            }}
-            
-            .features-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
-                gap: 20px;
-                margin: 40px 0;
-                width: 100%;
-            }}
-            
-            .feature-card {{
-                background: var(--youtube-card);
-                border: 1px solid var(--youtube-border);
-                border-radius: 16px;
-                padding: 25px;
-                transition: all 0.3s ease;
-                position: relative;
-                overflow: hidden;
-            }}
-            
-            .feature-card::before {{
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 2px;
-                background: var(--gradient-accent);
-                transition: left 0.3s ease;
-            }}
-            
-            .feature-card:hover {{
-                background: var(--youtube-card-hover);
-                transform: translateY(-5px);
-                box-shadow: 0 10px 30px rgba(255, 0, 0, 0.2);
-            }}
-            
-            .feature-card:hover::before {{
-                left: 0;
-            }}
-            
-            .feature-icon {{
-                font-size: 2.5rem;
-                margin-bottom: 15px;
-                display: block;
-            }}
-            
-            .feature-title {{
-                font-size: 1.1rem;
-                font-weight: 600;
-                margin-bottom: 10px;
-                color: var(--youtube-text-primary);
-            }}
-            
-            .feature-desc {{
-                color: var(--youtube-text-secondary);
-                font-size: 0.9rem;
-                line-height: 1.4;
-            }}
-            
-            .api-links {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 15px;
-                justify-content: center;
-                margin: 40px 0;
-            }}
-            
-            .api-link {{
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-                background: var(--youtube-card);
-                border: 1px solid var(--youtube-border);
-                color: var(--youtube-text-primary);
-                text-decoration: none;
-                padding: 12px 20px;
-                border-radius: 12px;
-                font-weight: 500;
-                transition: all 0.3s ease;
-                font-size: 0.9rem;
-            }}
-            
-            .api-link:hover {{
-                background: var(--gradient-accent);
-                transform: translateY(-2px);
-                box-shadow: 0 8px 20px rgba(255, 0, 0, 0.3);
-                border-color: transparent;
-            }}
-            
-            .footer-info {{
-                margin-top: 40px;
-                padding-top: 30px;
-                border-top: 1px solid var(--youtube-border);
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                width: 100%;
-            }}
-            
-            .info-item {{
-                display: flex;
-                align-items: center;
-                gap: 10px;
-                font-size: 0.9rem;
-                color: var(--youtube-text-secondary);
-            }}
-            
-            .status-success {{ color: #00ff88; }}
-            .status-warning {{ color: #ffaa00; }}
-            .status-error {{ color: #ff4444; }}
-            
-            .copyright {{
-                margin-top: 30px;
-                text-align: center;
-                font-size: 0.8rem;
-                color: var(--youtube-text-secondary);
-                opacity: 0.7;
-            }}
-            
-            /* Responsive design */
-            @media (max-width: 768px) {{
-                .main-card {{
-                    padding: 30px 25px;
-                    margin: 20px;
-                }}
-                
-                .logo {{
-                    font-size: 2.5rem;
-                }}
-                
-                .features-grid {{
-                    grid-template-columns: 1fr;
-                }}
-                
-                .api-links {{
-                    gap: 10px;
-                }}
-                
-                .footer-info {{
-                    grid-template-columns: 1fr;
-                    text-align: center;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="bg-animation"></div>
-        
-        <div class="container">
-            <div class="main-card">
-                <div class="logo-section">
-                    <div class="logo">🎬 YouTube Downloader</div>
-                    <div class="version-badge">
-                        <span>⚡</span>
-                        <span>v{settings.VERSION}</span>
-                    </div>
-                </div>
-                
-                <div class="status-indicator">
-                    <div class="status-dot"></div>
-                    <span>🚀 API Server Running</span>
-                </div>
-                
-                <p class="description">
-                    Professional-grade YouTube video downloading service featuring intelligent quality selection, 
-                    seamless FFmpeg integration, and lightning-fast performance optimization.
-                </p>
-                
-                <div class="features-grid">
-                    <div class="feature-card">
-                        <div class="feature-icon">🎯</div>
-                        <div class="feature-title">Smart Download</div>
-                        <div class="feature-desc">AI-powered quality selection with automatic video+audio merging for optimal results</div>
-                    </div>
-                    <div class="feature-card">
-                        <div class="feature-icon">⚡</div>
-                        <div class="feature-title">High Performance</div>
-                        <div class="feature-desc">Parallel processing with intelligent caching and optimized streaming</div>
-                    </div>
-                    <div class="feature-card">
-                        <div class="feature-icon">🛠️</div>
-                        <div class="feature-title">FFmpeg Integration</div>
-                        <div class="feature-desc">Professional video/audio processing with advanced codec support</div>
-                    </div>
-                </div>
-                
-                <div class="api-links">
-                    <a href="/docs" class="api-link">
-                        <span>📚</span>
-                        <span>API Documentation</span>
-                    </a>
-                    <a href="/health" class="api-link">
-                        <span>💚</span>
-                        <span>Health Dashboard</span>
-                    </a>
-                    <a href="/api/system-info" class="api-link">
-                        <span>ℹ️</span>
-                        <span>System Information</span>
-                    </a>
-                    <a href="/redoc" class="api-link">
-                        <span>📋</span>
-                        <span>ReDoc</span>
-                    </a>
-                </div>
-                
-                <div class="footer-info">
-                    <div class="info-item">
-                        <span>🔧</span>
-                        <span>FFmpeg:</span>
-                        <span class="{'status-success' if ffmpeg_service.is_available() else 'status-warning'}">
-                            {('✅ Available' if ffmpeg_service.is_available() else '⚠️ Not Available')}
-                        </span>
-                    </div>
-                    <div class="info-item">
-                        <span>🚀</span>
-                        <span>Smart Downloads:</span>
-                        <span class="{'status-success' if ffmpeg_service.is_available() else 'status-warning'}">
-                            {('✅ Supported' if ffmpeg_service.is_available() else '⚠️ Limited')}
-                        </span>
-                    </div>
-                    <div class="info-item">
-                        <span>⚡</span>
-                        <span>Performance:</span>
-                        <span class="status-success">✅ Optimized</span>
-                    </div>
-                </div>
-                
-                <div class="copyright">
-                    Built with FastAPI • Professional Architecture • Production Ready<br>
-                    <small style="opacity: 0.6;">📚 Documentation available in <code>documentation/</code> folder</small>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+    return _encoded_html_response(request, _root_page_variants(), _root_page_etag(), ROOT_CACHE_CONTROL)
 
-@app.get("/status")
-async def api_status():
-    """JSON API status endpoint for programmatic access."""
-    return {
+@lru_cache(maxsize=1)
+def _status_body() -> bytes:
+    """Serialize the /status payload once; every field is fixed for the process lifetime."""
+    return orjson.dumps({
         "message": "YouTube Downloader API is running - ORGANIZED VERSION",
         "version": settings.VERSION,
         "status": "active",
@@ -547,290 +555,74 @@ async def api_status():
             "download": "/api/download",
             "smart_download": "/api/smart-download"
         }
-    }
+    })
+
+
+@app.get("/status")
+async def api_status():
+    """JSON API status endpoint for programmatic access."""
+    return Response(content=_status_body(), media_type="application/json")
+
+@lru_cache(maxsize=1)
+def _render_health_page() -> bytes:
+    """
+    Render the static health dashboard skeleton once.
+    
+    Cache metrics are filled in client-side from /health/data, so the page
+    itself only depends on process-global state.
+    """
+    html_content = _template_env.render_template(
+        "health.html",
+        stylesheet=asset_url("health.css"),
+        ffmpeg=ffmpeg_service.is_available()
+    )
+    return html_content.encode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def _health_page_variants() -> Dict[str, bytes]:
+    """Pre-compressed (identity/gzip/br) variants of the health dashboard."""
+    return CompressionHelper.compress_variants(_render_health_page())
+
+
+@lru_cache(maxsize=1)
+def _health_page_etag() -> str:
+    """ETag of the rendered health dashboard skeleton."""
+    return _content_etag(_render_health_page())
+
 
 @app.get("/health", response_class=HTMLResponse)
-async def health_check():
+async def health_check(request: Request):
     """Beautiful health check dashboard matching system design."""
-    ffmpeg_status = ffmpeg_service.is_available()
+    return _encoded_html_response(request, _health_page_variants(), _health_page_etag(), HEALTH_CACHE_CONTROL)
+
+
+# Constant body for /healthz probes
+_HEALTHZ_BODY = orjson.dumps({"ok": True})
+
+
+@app.head("/health")
+async def health_head():
+    """Cheap liveness probe for load balancers; no body is rendered or sent."""
+    return Response(status_code=200, headers={"Cache-Control": "no-store"})
+
+
+@app.get("/healthz")
+async def healthz():
+    """Minimal JSON liveness probe for container orchestrators."""
+    return Response(content=_HEALTHZ_BODY, media_type="application/json")
+
+
+@app.get("/health/data")
+async def health_data():
+    """Live health metrics consumed by the /health dashboard."""
     cache_stats = video_cache.get_stats()
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>API Health Dashboard</title>
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-        <style>
-            :root {{
-                --youtube-red: #ff0000;
-                --youtube-dark: #0f0f0f;
-                --youtube-card: #1c1c1c;
-                --youtube-card-hover: #272727;
-                --youtube-text-primary: #ffffff;
-                --youtube-text-secondary: #aaaaaa;
-                --youtube-border: #303030;
-                --status-success: #00ff88;
-                --status-warning: #ffaa00;
-                --status-error: #ff4444;
-                --gradient-primary: linear-gradient(135deg, #0f0f0f 0%, #1c1c1c 50%, #272727 100%);
-                --gradient-accent: linear-gradient(135deg, #ff0000 0%, #cc0000 50%, #990000 100%);
-                --glass-bg: rgba(28, 28, 28, 0.8);
-                --glass-border: rgba(255, 255, 255, 0.1);
-            }}
-            
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            
-            body {{
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-                background: var(--gradient-primary);
-                min-height: 100vh;
-                color: var(--youtube-text-primary);
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                padding: 20px;
-            }}
-            
-            .health-container {{
-                background: var(--glass-bg);
-                backdrop-filter: blur(20px);
-                border: 1px solid var(--glass-border);
-                border-radius: 24px;
-                padding: 40px;
-                text-align: center;
-                box-shadow: 
-                    0 20px 40px rgba(0, 0, 0, 0.4),
-                    0 0 0 1px rgba(255, 255, 255, 0.05),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.1);
-                max-width: 600px;
-                width: 100%;
-            }}
-            
-            .health-icon {{
-                font-size: 4rem;
-                margin-bottom: 20px;
-                animation: heartbeat 2s infinite;
-            }}
-            
-            @keyframes heartbeat {{
-                0%, 50%, 100% {{ transform: scale(1); }}
-                25%, 75% {{ transform: scale(1.1); }}
-            }}
-            
-            .health-title {{
-                font-size: 2.5rem;
-                font-weight: 700;
-                margin-bottom: 10px;
-                background: var(--gradient-accent);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }}
-            
-            .health-subtitle {{
-                color: var(--youtube-text-secondary);
-                font-size: 1.1rem;
-                margin-bottom: 40px;
-            }}
-            
-            .status-grid {{
-                display: grid;
-                gap: 15px;
-                margin: 30px 0;
-            }}
-            
-            .status-item {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                background: var(--youtube-card);
-                border: 1px solid var(--youtube-border);
-                padding: 20px;
-                border-radius: 12px;
-                transition: all 0.3s ease;
-            }}
-            
-            .status-item:hover {{
-                background: var(--youtube-card-hover);
-                transform: translateY(-2px);
-            }}
-            
-            .status-label {{
-                font-weight: 500;
-                color: var(--youtube-text-primary);
-            }}
-            
-            .status-value {{
-                font-weight: 600;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-            }}
-            
-            .status-success {{ color: var(--status-success); }}
-            .status-warning {{ color: var(--status-warning); }}
-            .status-error {{ color: var(--status-error); }}
-            
-            .metric-card {{
-                background: var(--youtube-card);
-                border: 1px solid var(--youtube-border);
-                border-radius: 12px;
-                padding: 20px;
-                margin: 15px 0;
-                text-align: left;
-            }}
-            
-            .metric-title {{
-                font-size: 0.9rem;
-                color: var(--youtube-text-secondary);
-                margin-bottom: 8px;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }}
-            
-            .metric-value {{
-                font-size: 1.8rem;
-                font-weight: 700;
-                color: var(--status-success);
-            }}
-            
-            .actions {{
-                margin-top: 40px;
-                display: flex;
-                gap: 15px;
-                justify-content: center;
-                flex-wrap: wrap;
-            }}
-            
-            .action-btn {{
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-                background: var(--youtube-card);
-                border: 1px solid var(--youtube-border);
-                color: var(--youtube-text-primary);
-                text-decoration: none;
-                padding: 12px 24px;
-                border-radius: 12px;
-                font-weight: 500;
-                transition: all 0.3s ease;
-            }}
-            
-            .action-btn:hover {{
-                background: var(--gradient-accent);
-                border-color: transparent;
-                transform: translateY(-2px);
-                box-shadow: 0 8px 20px rgba(255, 0, 0, 0.3);
-            }}
-            
-            .action-btn.primary {{
-                background: var(--gradient-accent);
-                border-color: transparent;
-            }}
-            
-            .action-btn.primary:hover {{
-                box-shadow: 0 8px 20px rgba(255, 0, 0, 0.4);
-            }}
-            
-            @media (max-width: 768px) {{
-                .health-container {{
-                    padding: 30px 20px;
-                    margin: 10px;
-                }}
-                
-                .health-title {{
-                    font-size: 2rem;
-                }}
-                
-                .actions {{
-                    flex-direction: column;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="health-container">
-            <div class="health-icon">💚</div>
-            <h1 class="health-title">System Health</h1>
-            <p class="health-subtitle">All systems operational and running smoothly</p>
-            
-            <div class="status-grid">
-                <div class="status-item">
-                    <span class="status-label">🌐 API Server</span>
-                    <span class="status-value status-success">
-                        <span>✅</span>
-                        <span>Running</span>
-                    </span>
-                </div>
-                
-                <div class="status-item">
-                    <span class="status-label">🔧 FFmpeg Engine</span>
-                    <span class="status-value {'status-success' if ffmpeg_status else 'status-warning'}">
-                        <span>{'✅' if ffmpeg_status else '⚠️'}</span>
-                        <span>{('Available' if ffmpeg_status else 'Not Available')}</span>
-                    </span>
-                </div>
-                
-                <div class="status-item">
-                    <span class="status-label">💾 Cache System</span>
-                    <span class="status-value status-success">
-                        <span>✅</span>
-                        <span>Active ({cache_stats['size']} entries)</span>
-                    </span>
-                </div>
-                
-                <div class="status-item">
-                    <span class="status-label">⚡ Performance</span>
-                    <span class="status-value status-success">
-                        <span>✅</span>
-                        <span>{cache_stats['hit_rate']:.1%} hit rate</span>
-                    </span>
-                </div>
-            </div>
-            
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin: 30px 0;">
-                <div class="metric-card">
-                    <div class="metric-title">Cache Hits</div>
-                    <div class="metric-value">{cache_stats['hits']:,}</div>
-                </div>
-                
-                <div class="metric-card">
-                    <div class="metric-title">Cache Size</div>
-                    <div class="metric-value">{cache_stats['size']}</div>
-                </div>
-                
-                <div class="metric-card">
-                    <div class="metric-title">Hit Rate</div>
-                    <div class="metric-value">{cache_stats['hit_rate']:.1%}</div>
-                </div>
-            </div>
-            
-            <div class="actions">
-                <a href="/" class="action-btn primary">
-                    <span>🏠</span>
-                    <span>Back to Home</span>
-                </a>
-                <a href="/api/system-info" class="action-btn">
-                    <span>ℹ️</span>
-                    <span>System Info</span>
-                </a>
-                <a href="/docs" class="action-btn">
-                    <span>📚</span>
-                    <span>API Docs</span>
-                </a>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+    return {
+        "ffmpeg": ffmpeg_service.is_available(),
+        "size": cache_stats['size'],
+        "hits": cache_stats['hits'],
+        "hit_rate": cache_stats['hit_rate']
+    }
 
 @app.post("/api/video-info", response_model=VideoMetadata)
 async def get_video_info(video_data: VideoURL):
@@ -838,37 +630,26 @@ async def get_video_info(video_data: VideoURL):
     Extract video metadata and available streams from YouTube URL.
     """
     try:
-        logger.info(f"Processing video URL: {video_data.url}")
-        
-        # Create YouTube object using service
-        yt = youtube_service.create_youtube_object(str(video_data.url))
+        video_url = str(video_data.url)
+        video_id = extract_video_id(video_url)
+        if not video_id:
+            return await run_blocking(load_video_info, video_url)
         
-        # Get metadata and streams using services
-        metadata = youtube_service.get_video_metadata(yt)
-        streams = youtube_service.get_stream_info(yt)
+        # One fetch per video at a time; concurrent requests wait for the cached result
+        lock = _video_info_locks.get(video_id)
+        if lock is None:
+            lock = _video_info_locks[video_id] = asyncio.Lock()
         
-        # Convert to StreamInfo models
-        stream_models = [
-            StreamInfo(**stream_data) for stream_data in streams
-        ]
+        async with lock:
+            video_info = video_cache.get_video_info(video_id)
+            if video_info is None:
+                video_info = await run_blocking(load_video_info, video_url)
+                video_cache.cache_video_info(video_id, video_info)
+            return video_info
         
-        logger.info(f"Successfully processed video: {metadata['title']} with {len(stream_models)} streams")
-        
-        return VideoMetadata(
-            title=metadata['title'],
-            duration=metadata['duration'],
-            thumbnail=metadata['thumbnail'],
-            uploader=metadata['uploader'],
-            view_count=metadata['view_count'],
-            streams=stream_models
-        )
-        
-    except VideoNotFoundError as e:
-        logger.error(f"Video not found: {e.message}")
-        raise HTTPException(status_code=404, detail=e.message)
-    except InvalidURLError as e:
-        logger.error(f"Invalid URL: {e.message}")
-        raise HTTPException(status_code=400, detail=e.message)
+    except YouTubeDownloaderError as e:
+        logger.error("Video info failed (%s): %s", e.error_code, e.message)
+        raise HTTPException(status_code=http_status_for(e), detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Generic error occurred")
 
@@ -877,71 +658,47 @@ async def download_video(download_request: DownloadRequest):
     """
     Download video stream and return as streaming response.
     """
-    temp_dir = None
+    output_path = None
     
     try:
-        logger.info(f"Starting download for URL: {download_request.video_url}, Stream ID: {download_request.stream_id}")
+        logger.info("Starting download for URL: %s, Stream ID: %s", download_request.video_url, download_request.stream_id)
         
         # Create YouTube object using service
-        yt = youtube_service.create_youtube_object(str(download_request.video_url))
+        yt = await run_blocking(youtube_service.create_youtube_object, str(download_request.video_url))
         
         # Get the requested stream
-        stream = youtube_service.get_stream_by_itag(yt, download_request.stream_id)
-        
-        # Create temporary directory
-        temp_dir = create_temp_directory()
+        stream = await run_blocking(youtube_service.get_stream_by_itag, yt, download_request.stream_id)
         
         # Create safe filename
         safe_title = youtube_service.create_safe_filename(yt.title or "download", download_request.stream_id)
         
-        # Determine file extension
-        extension = 'mp4' if stream.includes_video_track else 'mp3'
+        # Determine file extension and media type
+        extension, media_type = DOWNLOAD_FILE_TYPES[stream.includes_video_track, stream.includes_audio_track]
         filename = f"{safe_title}.{extension}"
         
-        # Download the stream
-        output_path = youtube_service.download_stream(stream, temp_dir, filename)
-        
-        # Determine media type
-        if stream.includes_video_track:
-            media_type = 'video/mp4'
-        elif stream.includes_audio_track:
-            media_type = 'audio/mp4'
-        else:
-            media_type = 'application/octet-stream'
-        
-        # Stream the file back to client
-        def iterfile(file_path: str):
-            try:
-                with open(file_path, mode="rb") as file_like:
-                    while True:
-                        chunk = file_like.read(settings.CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        yield chunk
-            finally:
-                # Clean up temp file and directory after streaming
-                cleanup_temp_directory(temp_dir)
+        # Download the stream into the shared scratch directory under a unique name
+        scratch_dir = app.state.scratch_dir
+        scratch_name = f"{secrets.token_hex(8)}_{filename}"
+        output_path = os.path.join(scratch_dir, scratch_name)
+        await run_blocking(youtube_service.download_stream, stream, scratch_dir, scratch_name)
         
-        return StreamingResponse(
-            iterfile(output_path),
+        # Send the file back to client; it is removed once the body is sent
+        return DownloadFileResponse(
+            output_path,
             media_type=media_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            filename=filename,
+            background=BackgroundTask(FileHelper.cleanup_file, output_path)
         )
         
-    except StreamNotFoundError as e:
-        logger.error(f"Stream not found: {e.message}")
-        if temp_dir:
-            cleanup_temp_directory(temp_dir)
-        raise HTTPException(status_code=404, detail=e.message)
-    except DownloadError as e:
-        logger.error(f"Download failed: {e.message}")
-        if temp_dir:
-            cleanup_temp_directory(temp_dir)
-        raise HTTPException(status_code=500, detail=e.message)
+    except YouTubeDownloaderError as e:
+        logger.error("Download failed (%s): %s", e.error_code, e.message)
+        if output_path:
+            await asyncio.to_thread(FileHelper.cleanup_file, output_path)
+        raise HTTPException(status_code=http_status_for(e), detail=e.message)
     except Exception as e:
-        logger.error(f"Unexpected error in download: {e}")
-        if temp_dir:
-            cleanup_temp_directory(temp_dir)
+        logger.error("Unexpected error in download: %s", e)
+        if output_path:
+            await asyncio.to_thread(FileHelper.cleanup_file, output_path)
 
 @app.get("/api/system-info", response_model=SystemInfo)
 async def get_system_info():
@@ -959,24 +716,23 @@ async def get_system_info():
 async def get_smart_download_info_endpoint(request: SmartDownloadRequest):
     """Get information about the recommended smart download option."""
     try:
-        logger.info(f"Getting smart download info for: {request.video_url}")
+        logger.info("Getting smart download info for: %s", request.video_url)
         start_time = time.time()
         
-        # Cleanup expired cache entries periodically
-        video_cache.cleanup()
-        
-        # Use fast cached analysis
-        smart_option = get_fast_smart_selection(str(request.video_url), prefer_progressive=request.prefer_progressive)
+        # Run the cached analysis and the metadata lookup concurrently
+        smart_option, yt = await asyncio.gather(
+            run_blocking(get_fast_smart_selection, str(request.video_url), request.prefer_progressive),
+            run_blocking(youtube_service.create_youtube_object, str(request.video_url))
+        )
         
         if not smart_option:
             raise HTTPException(status_code=404, detail="No suitable streams found for smart download")
         
         # Get metadata for title and duration
-        yt = youtube_service.create_youtube_object(str(request.video_url))
-        metadata = youtube_service.get_video_metadata(yt)
+        metadata = await run_blocking(youtube_service.get_video_metadata, yt)
         
         elapsed_time = time.time() - start_time
-        logger.info(f"Smart download info completed in {elapsed_time:.2f} seconds")
+        logger.info("Smart download info completed in %.2f seconds", elapsed_time)
         
         return SmartDownloadInfo(
             video_title=metadata['title'],
@@ -990,8 +746,12 @@ async def get_smart_download_info_endpoint(request: SmartDownloadRequest):
         
     except HTTPException:
         raise
+    except YouTubeDownloaderError as e:
+        # e.g. an unavailable video raised by the concurrent metadata lookup
+        logger.error("Smart download info error (%s): %s", e.error_code, e.message)
+        raise HTTPException(status_code=http_status_for(e), detail=e.message)
     except Exception as e:
-        logger.error(f"Error getting smart download info: {e}")
+        logger.error("Error getting smart download info: %s", e)
 
 @app.post("/api/smart-download")
 async def smart_download(request: SmartDownloadRequest):
@@ -999,17 +759,19 @@ async def smart_download(request: SmartDownloadRequest):
     temp_dir = None
     
     try:
-        logger.info(f"Starting smart download for: {request.video_url}")
+        logger.info("Starting smart download for: %s", request.video_url)
         start_time = time.time()
         
         # Get smart selection
-        smart_option = get_fast_smart_selection(str(request.video_url), prefer_progressive=request.prefer_progressive)
+        smart_option = await run_blocking(
+            get_fast_smart_selection, str(request.video_url), request.prefer_progressive
+        )
         
         if not smart_option:
             raise HTTPException(status_code=404, detail="No suitable streams found for smart download")
         
         # Create YouTube object and metadata
-        yt = youtube_service.create_youtube_object(str(request.video_url))
+        yt = await run_blocking(youtube_service.create_youtube_object, str(request.video_url))
         safe_title = youtube_service.create_safe_filename(yt.title or "smart_download")
         
         # Create temporary directory
@@ -1021,7 +783,7 @@ async def smart_download(request: SmartDownloadRequest):
             
             video_stream = smart_option['video_stream']
             filename = f"{safe_title}_Smart.mp4"
-            output_path = youtube_service.download_stream(video_stream, temp_dir, filename)
+            output_path = await run_blocking(youtube_service.download_stream, video_stream, temp_dir, filename)
             
         elif smart_option['type'] == 'merge':
             # Download and merge video + audio
@@ -1037,104 +799,142 @@ async def smart_download(request: SmartDownloadRequest):
             video_filename = f"{safe_title}_video_temp.{video_stream.subtype}"
             audio_filename = f"{safe_title}_audio_temp.{audio_stream.subtype}"
             
-            # Download both streams in parallel
-            def download_video():
-                return youtube_service.download_stream(video_stream, temp_dir, video_filename)
-            
-            def download_audio():
-                return youtube_service.download_stream(audio_stream, temp_dir, audio_filename)
+            # Download both streams concurrently, each over parallel HTTP ranges
+            video_path, audio_path = await asyncio.gather(
+                async_downloader.download_stream(video_stream, temp_dir, video_filename),
+                async_downloader.download_stream(audio_stream, temp_dir, audio_filename)
+            )
             
-            # Execute downloads in parallel
-            with ThreadPoolExecutor(max_workers=settings.MAX_CONCURRENT_DOWNLOADS) as executor:
-                video_future = executor.submit(download_video)
-                audio_future = executor.submit(download_audio)
-                
-                video_path = video_future.result()
-                audio_path = audio_future.result()
+            # Merge with FFmpeg straight into the response; no merged file is written
+            merge_cmd = ffmpeg_service.merge_stream_command(
+                video_path, audio_path, source_audio_codec=audio_stream.audio_codec
+            )
             
-            # Merge using FFmpeg
-            output_filename = f"{safe_title}_Smart.mp4"
-            output_path = os.path.join(temp_dir, output_filename)
+            elapsed_time = time.time() - start_time
+            logger.info("Smart download merge streaming after %.2f seconds", elapsed_time)
             
-            ffmpeg_service.merge_video_audio(
-                video_path, audio_path, output_path, cleanup_temp=True
+            # Merge directory (with the source streams) is removed once FFmpeg is done
+            return StreamingResponse(
+                ffmpeg_service.iter_merge_stream(merge_cmd),
+                media_type='video/mp4',
+                headers={"Content-Disposition": attachment_disposition(f"{safe_title}_Smart.mp4")},
+                background=BackgroundTask(ffmpeg_service.cleanup_merge_dir, temp_dir)
             )
         
         else:
             raise HTTPException(status_code=500, detail="Unknown smart download type")
         
-        # Stream the result
-        def iterfile():
-            try:
-                with open(output_path, mode="rb") as file_like:
-                    while True:
-                        chunk = file_like.read(settings.CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        yield chunk
-            finally:
-                # Cleanup after streaming
-                ffmpeg_service.cleanup_merge_dir(temp_dir)
-        
         elapsed_time = time.time() - start_time
-        logger.info(f"Smart download completed in {elapsed_time:.2f} seconds")
+        logger.info("Smart download completed in %.2f seconds", elapsed_time)
         
-        return StreamingResponse(
-            iterfile(),
+        # Send the result; merge directory is removed once the body is sent
+        return DownloadFileResponse(
+            output_path,
             media_type='video/mp4',
-            headers={"Content-Disposition": f"attachment; filename={os.path.basename(output_path)}"}
+            filename=os.path.basename(output_path),
+            background=BackgroundTask(ffmpeg_service.cleanup_merge_dir, temp_dir)
         )
         
-    except (FFmpegNotFoundError, MergeError) as e:
-        logger.error(f"FFmpeg/Merge error: {e.message}")
-        if temp_dir:
-            ffmpeg_service.cleanup_merge_dir(temp_dir)
-        raise HTTPException(status_code=500, detail=e.message)
-    except DownloadError as e:
-        logger.error(f"Download error: {e.message}")
+    except YouTubeDownloaderError as e:
+        logger.error("Smart download error (%s): %s", e.error_code, e.message)
         if temp_dir:
-            ffmpeg_service.cleanup_merge_dir(temp_dir)
-        raise HTTPException(status_code=500, detail=e.message)
+            await asyncio.to_thread(ffmpeg_service.cleanup_merge_dir, temp_dir)
+        raise HTTPException(status_code=http_status_for(e), detail=e.message)
     except Exception as e:
-        logger.error(f"Unexpected error in smart download: {e}")
+        logger.error("Unexpected error in smart download: %s", e)
         if temp_dir:
-            ffmpeg_service.cleanup_merge_dir(temp_dir)
+            await asyncio.to_thread(ffmpeg_service.cleanup_merge_dir, temp_dir)
         raise HTTPException(status_code=500, detail=f"Smart download failed: {str(e)}")
 
 
-EMAIL_REGEX = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
-_rate_limit_cache: Dict[str, List[float]] = {}
+# Per-IP submission times (monotonic), oldest first; least recently seen IP first
+_rate_limit_cache: "OrderedDict[str, Deque[float]]" = OrderedDict()
+_rate_limit_requests = 0
+RATE_LIMIT_SWEEP_INTERVAL = 1024  # Requests between sweeps of idle IPs
+RATE_LIMIT_MAX_IPS = 50000  # LRU bound so randomized source IPs can't grow the table
+
+# In-flight contact email sends (fire-and-forget tasks)
+_pending_email_tasks: Set["asyncio.Task[None]"] = set()
+
+def _sweep_rate_limit_cache(window_seconds: float) -> None:
+    """Drop IPs with no submissions inside the window so the table stays bounded."""
+    cutoff = time.monotonic() - window_seconds
+    for client_ip in [ip for ip, timestamps in _rate_limit_cache.items() if not timestamps or timestamps[-1] <= cutoff]:
+        del _rate_limit_cache[client_ip]
 
-@app.post("/api/contact", response_model=ContactResponse)
-async def contact_endpoint(request: Request, payload: ContactRequest, background: BackgroundTasks = None):
+
+@app.post(
+    "/api/contact",
+    response_model=ContactResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": ContactRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
+async def contact_endpoint(request: Request):
     """Receive contact submission and send via Brevo."""
+    # Parse the raw body so bots are rejected before the model is built
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
     # Honeypot check
-    if payload.honeypot:
+    if body.get("honeypot"):
         raise HTTPException(status_code=400, detail="Spam detected")
 
+    # Timing anti-bot: require >= 2s from form start
+    form_start = body.get("formStartTimestamp")
+    if form_start is not None:
+        # Coerce like the model does, so a string timestamp can't skip the check
+        try:
+            form_start = float(form_start)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid formStartTimestamp")
+        if not math.isfinite(form_start):
+            raise HTTPException(status_code=400, detail="Invalid formStartTimestamp")
+        if time.time() - form_start < 2:
+            raise HTTPException(status_code=400, detail="Form submitted too quickly")
+
+    try:
+        payload = ContactRequest.model_validate(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False), body=body)
+
     # Basic validation
     if not payload.name.strip() or not payload.email.strip() or not payload.message.strip():
         raise HTTPException(status_code=400, detail="Missing required fields")
-    if not EMAIL_REGEX.match(payload.email):
+    if not ValidationHelper.is_valid_email(payload.email):
         raise HTTPException(status_code=400, detail="Invalid email")
     if len(payload.message.strip()) < 10:
         raise HTTPException(status_code=400, detail="Message too short")
 
-    # Timing anti-bot: require >= 2s from form start
-    now = time.time()
-    if payload.formStartTimestamp and (now - float(payload.formStartTimestamp) < 2):
-        raise HTTPException(status_code=400, detail="Form submitted too quickly")
-
     # Simple in-memory rate limiting by IP
     client_ip = request.client.host if request.client else "unknown"
     window_seconds = 60
     max_requests = int(os.getenv("RATE_LIMIT_PER_MIN", "5"))
-    timestamps = _rate_limit_cache.get(client_ip, [])
-    timestamps = [ts for ts in timestamps if now - ts < window_seconds]
+    global _rate_limit_requests
+    _rate_limit_requests += 1
+    if _rate_limit_requests % RATE_LIMIT_SWEEP_INTERVAL == 0:
+        _sweep_rate_limit_cache(window_seconds)
+
+    monotonic_now = time.monotonic()
+    timestamps = _rate_limit_cache.get(client_ip)
+    if timestamps is None:
+        timestamps = _rate_limit_cache[client_ip] = deque()
+        if len(_rate_limit_cache) > RATE_LIMIT_MAX_IPS:
+            _rate_limit_cache.popitem(last=False)
+    else:
+        _rate_limit_cache.move_to_end(client_ip)
+    while timestamps and monotonic_now - timestamps[0] >= window_seconds:
+        timestamps.popleft()
     if len(timestamps) >= max_requests:
         raise HTTPException(status_code=429, detail="Too many requests, please try later")
-    timestamps.append(now)
-    _rate_limit_cache[client_ip] = timestamps
+    timestamps.append(monotonic_now)
 
     # Prepare Brevo payload
     brevo_api_key = os.getenv("BREVO_API_KEY")
@@ -1163,27 +963,25 @@ async def contact_endpoint(request: Request, payload: ContactRequest, background
 
     async def send_email_async():
         try:
-            async with httpx.AsyncClient(timeout=8) as client:
-                resp = await client.post(
-                    "https://api.brevo.com/v3/smtp/email",
-                    headers={
-                        "api-key": brevo_api_key,
-                        "accept": "application/json",
-                        "content-type": "application/json",
-                    },
-                    json=json_body,
-                )
-                if resp.status_code >= 300:
-                    logger.error(f"Brevo error: {resp.status_code} {resp.text}")
+            resp = await app.state.http.post(
+                "https://api.brevo.com/v3/smtp/email",
+                headers={
+                    "api-key": brevo_api_key,
+                    "accept": "application/json",
+                    "content-type": "application/json",
+                },
+                json=json_body,
+                timeout=8,
+            )
+            if resp.status_code >= 300:
+                logger.error("Brevo error: %s %s", resp.status_code, resp.text)
         except Exception as e:
-            logger.error(f"Brevo exception: {e}")
+            logger.error("Brevo exception: %s", e)
 
-    # Schedule background send and return immediately
-    if background is not None:
-        background.add_task(send_email_async)
-    else:
-        # Fallback if BackgroundTasks not available
-        await send_email_async()
+    # Send in the background and return immediately; keep a reference so the task isn't GC'd
+    task = asyncio.create_task(send_email_async())
+    _pending_email_tasks.add(task)
+    task.add_done_callback(_pending_email_tasks.discard)
 
     return ContactResponse(success=True, message="Queued")
 
@@ -1194,39 +992,39 @@ async def contact_endpoint(request: Request, payload: ContactRequest, background
 
 if __name__ == "__main__":
     logger.info("Starting YouTube Downloader API - Organized Version")
-    logger.info(f"FFmpeg available: {ffmpeg_service.is_available()}")
-    logger.info(f"Smart download supported: {ffmpeg_service.is_available()}")
+    logger.info("FFmpeg available: %s", ffmpeg_service.is_available())
+    logger.info("Smart download supported: %s", ffmpeg_service.is_available())
     
-    # Force host to 0.0.0.0 for Railway/deployment (more precise detection)
-    is_railway = (
-        os.getenv("ENVIRONMENT") == "production" or 
-        os.getenv("RAILWAY_ENVIRONMENT") or 
-        (os.getenv("PORT") and os.getenv("PORT") != "8000") or  # Railway sets non-standard PORT
-        (os.getenv("HOSTNAME") and "railway" in os.getenv("HOSTNAME", "").lower())
-    )
+    # Host, port and Railway detection were resolved once by settings.refresh()
+    host = settings.get_server_host()
+    port = settings.get_port()
     
-    # Use 127.0.0.1 for development, 0.0.0.0 for Railway/production
-    host = "0.0.0.0" if is_railway else "127.0.0.1"
-    port = int(os.getenv("PORT", settings.PORT))
+    # Prefer the libuv event loop and C HTTP parser (shipped with uvicorn[standard]);
+    # uvloop is unavailable on Windows, so fall back to the pure-Python defaults
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "h11"
     
-    logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
-    logger.info(f"Railway detected: {is_railway}")
-    logger.info(f"Starting server on {host}:{port}")
+    logger.info("Environment: %s", settings.get_environment())
+    logger.info("Railway detected: %s", settings.is_railway())
+    logger.info("Event loop: %s, HTTP parser: %s", loop_impl, http_impl)
+    logger.info("Starting server on %s:%s", host, port)
     
-    # Use import string for reload functionality
-    if settings.is_development() and settings.RELOAD:
-        uvicorn.run(
-            "main:app",  # Import string format for reload
-            host=host,
-            port=port,
-            reload=True,
-            log_level=settings.LOG_LEVEL.lower()
-        )
-    else:
-        uvicorn.run(
-            app,  # Direct app object for production
-            host=host,
-            port=port,
-            reload=False,
-            log_level=settings.LOG_LEVEL.lower()
-        )
\ No newline at end of file
+    # Reload needs the import string; production runs the app object directly
+    reload = settings.is_development() and settings.RELOAD
+    uvicorn.run(
+        "main:app" if reload else app,
+        host=host,
+        port=port,
+        reload=reload,
+        loop=loop_impl,
+        http=http_impl,
+        log_level=settings.LOG_LEVEL.lower()
+    )
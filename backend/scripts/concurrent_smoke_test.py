@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Concurrent smoke test for the YouTube Downloader API
+
+Runs the health check and the video-info checks from test_integration.py and
+test_video_analysis.py at the same time over one pooled HTTP client, then
+downloads the first MB of a stream.
+"""
+
+import asyncio
+import sys
+
+import httpx
+
+API_BASE = "http://localhost:8000"
+TEST_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"  # Rick Roll for testing
+SPECIFIC_VIDEO_URL = "https://www.youtube.com/watch?v=GFTDR8_q63M"
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_SAMPLE_BYTES = 1024 * 1024  # Stop after 1MB for the test
+
+
+async def fetch_video_info(client: httpx.AsyncClient, url: str):
+    """Fetch video info, returning (status code, JSON body or None)"""
+    response = await client.post("/api/video-info", json={"url": url})
+    return response.status_code, response.json() if response.status_code == 200 else None
+
+
+async def download_sample(client: httpx.AsyncClient, stream_id: str, video_url: str) -> int:
+    """Stream the start of a download to disk, writing off the event loop"""
+    async with client.stream(
+        "POST",
+        "/api/download",
+        json={"video_url": video_url, "stream_id": stream_id},
+        timeout=httpx.Timeout(120, connect=3)  # The backend fetches the whole stream before responding
+    ) as response:
+        print(f"Download test: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Download failed: {(await response.aread()).decode(errors='replace')}")
+            return 0
+
+        downloaded = 0
+        with open("test_concurrent_download.bin", "wb") as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(f.write, chunk)
+                downloaded += len(chunk)
+                if downloaded > DOWNLOAD_SAMPLE_BYTES:
+                    break
+        return downloaded
+
+
+async def main() -> int:
+    limits = httpx.Limits(max_connections=8, max_keepalive_connections=8)
+    async with httpx.AsyncClient(base_url=API_BASE, limits=limits, timeout=httpx.Timeout(60, connect=3)) as client:
+        try:
+            health, (info_status, info), (specific_status, specific_info) = await asyncio.gather(
+                client.get("/"),
+                fetch_video_info(client, TEST_URL),
+                fetch_video_info(client, SPECIFIC_VIDEO_URL)
+            )
+        except httpx.ConnectError:
+            print("❌ Backend is not running or not accessible")
+            return 1
+
+        print(f"✅ Health check: {health.status_code}")
+        for url, status, data in ((TEST_URL, info_status, info), (SPECIFIC_VIDEO_URL, specific_status, specific_info)):
+            if data:
+                print(f"✅ Video info {url}: {data['title']} ({len(data['streams'])} streams)")
+            else:
+                print(f"❌ Video info {url}: {status}")
+
+        if not info or not info['streams']:
+            print("❌ Video info test failed")
+            return 1
+
+        downloaded = await download_sample(client, info['streams'][0]['id'], TEST_URL)
+        if not downloaded:
+            return 1
+        print(f"✅ Download test successful: {downloaded} bytes saved as test_concurrent_download.bin")
+
+    print("\n🎉 API testing complete!")
+    return 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing YouTube Downloader API concurrently")
+    print("=" * 50)
+    sys.exit(asyncio.run(main()))
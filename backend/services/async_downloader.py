@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Async Segmented Downloader
+
+Downloads YouTube streams over several parallel HTTP range requests with httpx,
+so a single stream is fetched over multiple connections without tying up
+worker threads.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.exceptions import DownloadError
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncSegmentedDownloader:
+    """Service class for range-parallel stream downloads."""
+    
+    def __init__(self, segments: int = None, min_segment_size: int = None):
+        """
+        Initialize the downloader.
+        
+        Args:
+            segments: Maximum number of parallel byte ranges per stream
+            min_segment_size: Smallest range worth its own request, in bytes
+        """
+        self.segments = segments or settings.DOWNLOAD_SEGMENTS
+        self.min_segment_size = min_segment_size or settings.MIN_SEGMENT_SIZE
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client, creating it on first use.
+        
+        HTTP/1.1 is used on purpose: each range gets its own TCP connection
+        instead of being multiplexed over one HTTP/2 connection.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=False,
+                follow_redirects=True,
+                timeout=httpx.Timeout(settings.DOWNLOAD_TIMEOUT, connect=10),
+                limits=httpx.Limits(
+                    max_connections=self.segments * settings.MAX_YT_WORKERS,
+                    max_keepalive_connections=self.segments * 2
+                )
+            )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def split_ranges(self, total_size: int) -> List[Tuple[int, int]]:
+        """
+        Split a file into contiguous inclusive byte ranges.
+        
+        Args:
+            total_size: File size in bytes
+            
+        Returns:
+            List of (start, end) byte offsets covering the whole file
+        """
+        count = max(1, min(self.segments, total_size // self.min_segment_size))
+        step = -(-total_size // count)  # Ceiling division
+        return [
+            (start, min(start + step, total_size) - 1)
+            for start in range(0, total_size, step)
+        ]
+    
+    async def download_stream(self, stream, output_dir: str, filename: str) -> str:
+        """
+        Download a PyTubeFix stream using parallel range requests.
+        
+        Args:
+            stream: PyTubeFix stream object
+            output_dir: Output directory path
+            filename: Output filename
+            
+        Returns:
+            Path to downloaded file
+            
+        Raises:
+            DownloadError: If download fails
+        """
+        output_path = os.path.join(output_dir, filename)
+        client = self._get_client()
+        
+        try:
+            # Resolving the URL may decipher signatures, which is blocking work
+            url = await asyncio.to_thread(lambda: stream.url)
+            
+            head = await client.head(url)
+            head.raise_for_status()
+            total_size = int(head.headers.get("content-length", 0))
+            if total_size <= 0:
+                raise DownloadError(f"Unknown content length for {filename}", url)
+            
+            fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+            tasks: List["asyncio.Task[None]"] = []
+            try:
+                # Reserve the full size up front so segments can write at their offsets
+                if hasattr(os, "posix_fallocate"):
+                    os.posix_fallocate(fd, 0, total_size)
+                else:
+                    os.ftruncate(fd, total_size)
+                
+                ranges = self.split_ranges(total_size)
+                tasks = [
+                    asyncio.create_task(self._download_range(client, url, fd, start, end))
+                    for start, end in ranges
+                ]
+                await asyncio.gather(*tasks)
+            finally:
+                await _close_after(tasks, fd)
+            
+            logger.info(f"Downloaded {filename} ({total_size} bytes) in {len(ranges)} segments")
+            return output_path
+        except DownloadError:
+            raise
+        except Exception as e:
+            raise DownloadError(f"Failed to download stream: {str(e)}")
+    
+    async def _download_range(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        fd: int,
+        start: int,
+        end: int
+    ) -> None:
+        """
+        Fetch one byte range and write it at its offset in the output file.
+        
+        Args:
+            client: HTTP client
+            url: Stream URL
+            fd: Open output file descriptor
+            start: First byte offset (inclusive)
+            end: Last byte offset (inclusive)
+            
+        Raises:
+            DownloadError: If the server ignores the range or returns short data
+        """
+        offset = start
+        async with client.stream("GET", url, headers={"Range": f"bytes={start}-{end}"}) as response:
+            if response.status_code != 206:
+                raise DownloadError(f"Range request not honoured (HTTP {response.status_code})", url)
+            
+            async for chunk in response.aiter_bytes(settings.CHUNK_SIZE):
+                write = asyncio.ensure_future(asyncio.to_thread(_write_at, fd, chunk, offset))
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # The worker thread can't be interrupted; let it finish before fd may be closed
+                    await asyncio.wait({write})
+                    raise
+                offset += len(chunk)
+        
+        if offset != end + 1:
+            raise DownloadError(f"Incomplete range {start}-{end}: got {offset - start} bytes", url)
+
+
+async def _close_after(tasks: List["asyncio.Task[None]"], fd: int) -> None:
+    """
+    Cancel unfinished range tasks and close fd once every one of them has stopped.
+    
+    A failed range makes gather() raise while its siblings still have writes
+    in flight, so fd must stay open until they are done. The close runs from
+    a callback, so it still happens if the caller is cancelled while waiting.
+    """
+    for task in tasks:
+        task.cancel()
+    
+    if not tasks:
+        os.close(fd)
+        return
+    
+    stopped = asyncio.gather(*tasks, return_exceptions=True)
+    stopped.add_done_callback(lambda _: os.close(fd))
+    await asyncio.shield(stopped)
+
+
+# Guards the seek + write fallback on platforms without os.pwrite
+_seek_write_lock = threading.Lock()
+
+
+def _write_at(fd: int, data: bytes, offset: int) -> None:
+    """Write data at an absolute file offset (positional write where supported)."""
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    else:
+        # No pwrite (Windows): seek + write share the file position, so serialize them
+        with _seek_write_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+
+# Global service instance
+async_downloader = AsyncSegmentedDownloader()
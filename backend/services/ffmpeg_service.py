@@ -6,24 +6,34 @@ Service layer for FFmpeg operations including video/audio merging, format conver
 and media processing capabilities.
 """
 
+import asyncio
 import logging
 import os
 import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+from app.config import settings
 from app.exceptions import (
     FFmpegError,
     FFmpegNotFoundError,
     MergeError,
     ConfigurationError
 )
+from utils.helpers import FileHelper
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Read size for streaming FFmpeg output from its stdout pipe
+MERGE_STREAM_CHUNK_SIZE = 256 * 1024
+
+# Codec name prefixes (ffprobe and pytubefix spellings) that can be stream-copied into MP4
+AAC_CODEC_NAMES = ('aac', 'mp4a')
+
 
 class FFmpegService:
     """Service class for FFmpeg operations."""
@@ -33,6 +43,14 @@ class FFmpegService:
         self.timeout = 300  # 5 minutes default timeout for merge operations
         self._ffmpeg_executable = None
         self._check_and_set_executable()
+        
+        # Bounds concurrent streaming merges; extra requests wait for a slot
+        self._merge_slots = asyncio.Semaphore(settings.FFMPEG_CONCURRENCY)
+        
+        # The executable is fixed for the process lifetime; the version is probed on first use
+        self._available = self._ffmpeg_executable is not None
+        self._version_info: Optional[str] = None
+        self._version_probed = not self._available
     
     def _check_and_set_executable(self) -> None:
         """Check for FFmpeg availability and set the executable path."""
@@ -40,7 +58,7 @@ class FFmpegService:
         
         # Check local project installation first
         local_ffmpeg = os.path.join(os.path.dirname(__file__), '..', 'ffmpeg', 'ffmpeg.exe')
-        if os.path.exists(local_ffmpeg):
+        if FileHelper.is_executable_file(local_ffmpeg):
             self._ffmpeg_executable = local_ffmpeg
             logger.info("Using local project FFmpeg installation")
             return
@@ -49,27 +67,19 @@ class FFmpegService:
         try:
             import imageio_ffmpeg as ffmpeg
             ffmpeg_exe = ffmpeg.get_ffmpeg_exe()
-            if os.path.exists(ffmpeg_exe):
+            if FileHelper.is_executable_file(ffmpeg_exe):
                 self._ffmpeg_executable = ffmpeg_exe
                 logger.info("Using imageio-ffmpeg installation")
                 return
         except ImportError:
             pass
         
-        # Check system PATH
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-version'], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            if result.returncode == 0:
-                self._ffmpeg_executable = 'ffmpeg'
-                logger.info("Using system PATH FFmpeg")
-                return
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            pass
+        # Check system PATH (a path lookup, no need to spawn the binary)
+        system_ffmpeg = shutil.which('ffmpeg')
+        if system_ffmpeg:
+            self._ffmpeg_executable = system_ffmpeg
+            logger.info("Using system PATH FFmpeg")
+            return
         
         # FFmpeg not found
         self._ffmpeg_executable = None
@@ -82,35 +92,43 @@ class FFmpegService:
         Returns:
             True if FFmpeg is available, False otherwise
         """
-        return self._ffmpeg_executable is not None
+        return self._available
     
     def get_version_info(self) -> Optional[str]:
         """
-        Get FFmpeg version information.
+        Get FFmpeg version information (probed once, on first call).
         
         Returns:
             Version string if available, None otherwise
         """
-        if not self.is_available():
-            return None
-        
+        if not self._version_probed:
+            self._version_info = self._probe_version_info()
+            self._version_probed = True
+        return self._version_info
+    
+    def _probe_version_info(self) -> Optional[str]:
+        """Run `ffmpeg -version` and read just its first (version) line."""
         try:
-            result = subprocess.run(
-                [self._ffmpeg_executable, '-version'], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
+            process = subprocess.Popen(
+                [self._ffmpeg_executable, '-version'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
             )
-            if result.returncode == 0:
-                # Extract just the version line
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if line.startswith('ffmpeg version'):
-                        if 'imageio-ffmpeg' in self._ffmpeg_executable:
-                            return line.strip() + " (via imageio-ffmpeg)"
-                        return line.strip()
+            try:
+                line = process.stdout.readline().strip()
+            finally:
+                # The build configuration that follows isn't needed
+                process.stdout.close()
+                process.kill()
+                process.wait()
+            
+            if line.startswith('ffmpeg version'):
+                if 'imageio-ffmpeg' in self._ffmpeg_executable:
+                    return line + " (via imageio-ffmpeg)"
+                return line
             return None
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
+        except (FileNotFoundError, OSError, subprocess.SubprocessError) as e:
             logger.error(f"Error getting FFmpeg version: {e}")
             return None
     
@@ -144,7 +162,8 @@ class FFmpegService:
         output_path: str,
         cleanup_temp: bool = True,
         video_codec: str = 'copy',
-        audio_codec: str = 'aac'
+        audio_codec: Optional[str] = None,
+        source_audio_codec: Optional[str] = None
     ) -> str:
         """
         Merge video and audio files using FFmpeg.
@@ -155,7 +174,8 @@ class FFmpegService:
             output_path: Path for output file
             cleanup_temp: Whether to cleanup temporary files after merge
             video_codec: Video codec to use ('copy' for no re-encoding)
-            audio_codec: Audio codec to use ('aac' recommended)
+            audio_codec: Audio codec to use; None copies AAC sources and encodes others to AAC
+            source_audio_codec: Known codec of the audio input (e.g. 'mp4a.40.2'), skips probing
             
         Returns:
             Path to merged output file
@@ -178,11 +198,7 @@ class FFmpegService:
             # Build FFmpeg command
             cmd = [
                 self._ffmpeg_executable,
-                '-i', video_path,      # Input video
-                '-i', audio_path,      # Input audio
-                '-c:v', video_codec,   # Video codec
-                '-c:a', audio_codec,   # Audio codec
-                '-shortest',           # Match shortest stream duration
+                *self._merge_args(video_path, audio_path, video_codec, audio_codec, source_audio_codec),
                 '-y',                  # Overwrite output file if exists
                 output_path            # Output file
             ]
@@ -205,7 +221,7 @@ class FFmpegService:
                 raise MergeError(error_msg, video_path, audio_path)
             
             # Verify output file was created and has content
-            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            if not FileHelper.has_content(output_path):
                 raise MergeError("Output file was not created or is empty", video_path, audio_path)
             
             logger.info(f"FFmpeg merge successful: {output_path}")
@@ -222,6 +238,176 @@ class FFmpegService:
             logger.error(f"Unexpected error during FFmpeg merge: {e}")
             raise MergeError(f"Merge failed: {str(e)}", video_path, audio_path)
     
+    def _merge_args(
+        self,
+        video_path: str,
+        audio_path: str,
+        video_codec: str,
+        audio_codec: Optional[str],
+        source_audio_codec: Optional[str]
+    ) -> List[str]:
+        """
+        Build the shared input/codec arguments for merge commands.
+        
+        AAC audio is stream-copied (no re-encode); anything else is encoded
+        with the fast AAC coder. Threading is left to FFmpeg (-threads 0).
+        
+        Args:
+            video_path: Path to video file
+            audio_path: Path to audio file
+            video_codec: Video codec to use
+            audio_codec: Audio codec to use, or None to choose automatically
+            source_audio_codec: Known codec of the audio input, if any
+            
+        Returns:
+            FFmpeg arguments from the first input through the codec options
+        """
+        if audio_codec is None:
+            audio_codec = 'copy' if self._is_aac(audio_path, source_audio_codec) else 'aac'
+        
+        args = [
+            '-fflags', '+genpts',          # Regenerate missing timestamps
+            '-i', video_path,              # Input video
+            '-i', audio_path,              # Input audio
+            '-c:v', video_codec,           # Video codec
+            '-c:a', audio_codec,           # Audio codec
+        ]
+        if audio_codec == 'aac':
+            args += ['-aac_coder', 'fast']
+        args += [
+            '-threads', '0',
+            '-avoid_negative_ts', 'make_zero',
+            '-shortest',                   # Match shortest stream duration
+        ]
+        return args
+    
+    def _is_aac(self, audio_path: str, source_audio_codec: Optional[str]) -> bool:
+        """
+        Check whether an audio input is AAC and can be copied into MP4 as-is.
+        
+        Args:
+            audio_path: Path to audio file
+            source_audio_codec: Known codec string (pytubefix 'mp4a.40.2' style), if any
+            
+        Returns:
+            True for AAC sources, False otherwise or when the codec is unknown
+        """
+        if source_audio_codec:
+            return source_audio_codec.lower().startswith(AAC_CODEC_NAMES)
+        
+        media_info = self.get_media_info(audio_path)
+        if not media_info:
+            return False
+        audio_streams = [
+            stream for stream in media_info.get('streams', [])
+            if stream.get('codec_type') == 'audio'
+        ]
+        return bool(audio_streams) and audio_streams[0].get('codec_name', '').lower().startswith(AAC_CODEC_NAMES)
+    
+    def merge_stream_command(
+        self,
+        video_path: str,
+        audio_path: str,
+        video_codec: str = 'copy',
+        audio_codec: Optional[str] = None,
+        source_audio_codec: Optional[str] = None
+    ) -> List[str]:
+        """
+        Build an FFmpeg merge command that writes fragmented MP4 to stdout.
+        
+        Fragmented output (empty moov + a fragment per keyframe) needs no
+        seekable file, so the merged video can be sent to the client while
+        FFmpeg is still running. Run the command with iter_merge_stream().
+        
+        Args:
+            video_path: Path to video file
+            audio_path: Path to audio file
+            video_codec: Video codec to use ('copy' for no re-encoding)
+            audio_codec: Audio codec to use; None copies AAC sources and encodes others to AAC
+            source_audio_codec: Known codec of the audio input (e.g. 'mp4a.40.2'), skips probing
+            
+        Returns:
+            FFmpeg argument list
+            
+        Raises:
+            FFmpegNotFoundError: If FFmpeg is not available
+            MergeError: If inputs are missing
+        """
+        if not self.is_available():
+            raise FFmpegNotFoundError()
+        
+        # Validate input files
+        if not os.path.exists(video_path):
+            raise MergeError(f"Video file not found: {video_path}", video_path)
+        
+        if not os.path.exists(audio_path):
+            raise MergeError(f"Audio file not found: {audio_path}", audio_file=audio_path)
+        
+        return [
+            self._ffmpeg_executable,
+            '-loglevel', 'error',                        # Keep stderr small; it is read after exit
+            *self._merge_args(video_path, audio_path, video_codec, audio_codec, source_audio_codec),
+            '-movflags', 'frag_keyframe+empty_moov',     # Streamable (non-seekable) MP4
+            '-f', 'mp4',
+            'pipe:1'                                     # Write to stdout
+        ]
+    
+    async def iter_merge_stream(
+        self,
+        cmd: List[str],
+        chunk_size: int = MERGE_STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Run a merge command from merge_stream_command() and yield its output.
+        
+        At most FFMPEG_CONCURRENCY merges run at once. The slot is taken and
+        FFmpeg started only once iteration begins, and both are released in
+        this generator's finally block, so a response whose body is never
+        sent holds neither.
+        
+        Pipe reads run in worker threads so the event loop never blocks, and
+        this works on every event loop (asyncio subprocesses need the
+        Proactor loop on Windows). FFmpeg is killed if the consumer stops early,
+        e.g. when the client disconnects.
+        
+        Args:
+            cmd: FFmpeg argument list from merge_stream_command()
+            chunk_size: Maximum bytes per yielded chunk
+            
+        Yields:
+            Chunks of fragmented MP4 data
+            
+        Raises:
+            MergeError: If FFmpeg cannot be started
+        """
+        async with self._merge_slots:
+            logger.info("Starting streaming FFmpeg merge")
+            logger.debug(f"FFmpeg command: {' '.join(cmd)}")
+            try:
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except OSError as e:
+                raise MergeError(f"Failed to start FFmpeg: {str(e)}")
+            
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(process.stdout.read1, chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+                
+                returncode = await asyncio.to_thread(process.wait)
+                if returncode != 0:
+                    stderr = process.stderr.read().decode(errors="replace")
+                    logger.error(f"Streaming FFmpeg merge failed ({returncode}): {stderr}")
+                else:
+                    logger.info("Streaming FFmpeg merge completed")
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    await asyncio.to_thread(process.wait)
+                process.stdout.close()
+                process.stderr.close()
+    
     def convert_audio_format(
         self, 
         input_path: str, 
@@ -294,7 +480,7 @@ class FFmpegService:
         Returns:
             Path to created temporary directory
         """
-        temp_dir = tempfile.mkdtemp(prefix=prefix)
+        temp_dir = tempfile.mkdtemp(prefix=prefix, dir=settings.get_temp_root())
         logger.debug(f"Created temporary merge directory: {temp_dir}")
         return temp_dir
     
@@ -306,9 +492,10 @@ class FFmpegService:
             temp_dir: Path to temporary directory to cleanup
         """
         try:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-                logger.debug(f"Cleaned up merge directory: {temp_dir}")
+            shutil.rmtree(temp_dir)
+            logger.debug(f"Cleaned up merge directory: {temp_dir}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.warning(f"Failed to cleanup merge directory {temp_dir}: {e}")
     
@@ -321,9 +508,10 @@ class FFmpegService:
         """
         for file_path in file_paths:
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    logger.debug(f"Cleaned up temporary file: {file_path}")
+                os.unlink(file_path)
+                logger.debug(f"Cleaned up temporary file: {file_path}")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Failed to cleanup file {file_path}: {e}")
     
@@ -337,12 +525,24 @@ class FFmpegService:
         Returns:
             Dictionary with media information or None if unavailable
         """
-        if not self.is_available() or not os.path.exists(file_path):
+        if not self.is_available():
             return None
         
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return None
+        
+        # Keyed on size + mtime so a rewritten file is probed again
+        return self._probe_media_info(file_path, stat_result.st_size, stat_result.st_mtime_ns)
+    
+    @lru_cache(maxsize=128)
+    def _probe_media_info(self, file_path: str, size: int, mtime_ns: int) -> Optional[Dict]:
+        """Run ffprobe on a file; results are memoized per (path, size, mtime)."""
         try:
             # Try to use ffprobe if available
-            ffprobe_cmd = self._ffmpeg_executable.replace('ffmpeg', 'ffprobe')
+            ffmpeg_dir, ffmpeg_name = os.path.split(self._ffmpeg_executable)
+            ffprobe_cmd = os.path.join(ffmpeg_dir, ffmpeg_name.replace('ffmpeg', 'ffprobe'))
             
             cmd = [
                 ffprobe_cmd,
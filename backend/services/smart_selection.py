@@ -19,18 +19,23 @@ License: MIT
 
 # Standard library imports
 import logging
-import re
+from functools import lru_cache
+from operator import attrgetter
 from typing import Any, Dict, List, Optional, Tuple
 
 # Third-party imports
 from pytubefix import YouTube
 
 # Local imports
-from app.config import QualityScores
+from app.config import AUDIO_CODEC_BONUS, FPS_BONUS, MB_PER_BYTE, VIDEO_CODEC_BONUS, QualityScores
+from utils.helpers import first_number, partition_streams, prefetch_filesizes
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Sort key for ranking StreamAnalysis lists (C-level attribute getter)
+_QUALITY_SCORE_KEY = attrgetter('quality_score')
+
 # ============================================================================
 # DATA MODELS AND CLASSES
 # ============================================================================
@@ -54,6 +59,9 @@ class StreamAnalysis:
         >>> print(f"Quality: {analysis.quality_score}, Size: {analysis.size_mb}MB")
     """
     
+    # One instance per analyzed stream; slots skip the per-instance __dict__
+    __slots__ = ('stream', 'stream_type', 'quality_score', 'size_mb', 'itag')
+    
     def __init__(self, stream, stream_type: str, quality_score: int, size_mb: float):
         """
         Initialize stream analysis container.
@@ -102,8 +110,7 @@ def extract_resolution_number(resolution_str: str) -> int:
     """
     if not resolution_str:
         return 0
-    match = re.search(r'(\d+)', str(resolution_str))
-    return int(match.group(1)) if match else 0
+    return first_number(resolution_str)
 
 def extract_audio_bitrate(abr_str: str) -> int:
     """
@@ -129,85 +136,76 @@ def extract_audio_bitrate(abr_str: str) -> int:
     """
     if not abr_str:
         return 0
-    match = re.search(r'(\d+)', str(abr_str))
-    return int(match.group(1)) if match else 0
+    return first_number(abr_str)
 
 def calculate_video_quality_score(stream) -> int:
     """Calculate quality score for video stream based on resolution, fps, and codec"""
+    return _video_quality_score(
+        getattr(stream, 'resolution', None),
+        getattr(stream, 'fps', None),
+        getattr(stream, 'video_codec', None)
+    )
+
+@lru_cache(maxsize=512)
+def _video_quality_score(resolution: Optional[str], fps: Optional[int], video_codec: Optional[str]) -> int:
+    """Score a (resolution, fps, codec) combination; these repeat across streams and videos"""
     score = 0
     
     # Resolution score (most important factor)
-    if hasattr(stream, 'resolution') and stream.resolution:
-        res_num = extract_resolution_number(stream.resolution)
-        # Use quality scores from config
-        if res_num >= 2160:      # 4K
-            score += QualityScores.VIDEO_SCORES.get(2160, 1000)
-        elif res_num >= 1440:    # 1440p
-            score += QualityScores.VIDEO_SCORES.get(1440, 800)
-        elif res_num >= 1080:    # 1080p  
-            score += QualityScores.VIDEO_SCORES.get(1080, 600)
-        elif res_num >= 720:     # 720p
-            score += QualityScores.VIDEO_SCORES.get(720, 400)
-        elif res_num >= 480:     # 480p
-            score += QualityScores.VIDEO_SCORES.get(480, 200)
-        else:                    # Lower resolutions
-            score += res_num // 10
+    if resolution:
+        res_num = extract_resolution_number(resolution)
+        score += QualityScores.video_score_for(res_num)
             
     # FPS bonus (if available)
-    if hasattr(stream, 'fps') and stream.fps:
-        if stream.fps >= 60:
-            score += QualityScores.FPS_BONUS.get(60, 50)
-        elif stream.fps >= 30:
-            score += QualityScores.FPS_BONUS.get(30, 25)
+    if fps:
+        if fps >= 60:
+            score += FPS_BONUS.get(60, 50)
+        elif fps >= 30:
+            score += FPS_BONUS.get(30, 25)
             
     # Codec quality bonus
-    if hasattr(stream, 'video_codec') and stream.video_codec:
-        codec = stream.video_codec.lower()
+    if video_codec:
+        codec = video_codec.lower()
         if 'av01' in codec:      # AV1 (most efficient)
-            score += QualityScores.VIDEO_CODEC_BONUS.get('av01', 30)
+            score += VIDEO_CODEC_BONUS.get('av01', 30)
         elif 'vp9' in codec:     # VP9 (good efficiency)
-            score += QualityScores.VIDEO_CODEC_BONUS.get('vp9', 20)
+            score += VIDEO_CODEC_BONUS.get('vp9', 20)
         elif 'h264' in codec:    # H.264 (standard)
-            score += QualityScores.VIDEO_CODEC_BONUS.get('h264', 10)
+            score += VIDEO_CODEC_BONUS.get('h264', 10)
             
     return score
 
 def calculate_audio_quality_score(stream) -> int:
     """Calculate quality score for audio stream based on bitrate and codec"""
+    return _audio_quality_score(getattr(stream, 'abr', None), getattr(stream, 'audio_codec', None))
+
+@lru_cache(maxsize=512)
+def _audio_quality_score(abr: Optional[str], audio_codec: Optional[str]) -> int:
+    """Score an (abr, codec) combination; these repeat across streams and videos"""
     score = 0
     
     # Bitrate score (most important for audio)
-    if hasattr(stream, 'abr') and stream.abr:
-        bitrate = extract_audio_bitrate(stream.abr)
-        if bitrate >= 320:       # Very high quality
-            score += QualityScores.AUDIO_SCORES.get(320, 300)
-        elif bitrate >= 256:     # High quality
-            score += QualityScores.AUDIO_SCORES.get(256, 250)
-        elif bitrate >= 192:     # Good quality
-            score += QualityScores.AUDIO_SCORES.get(192, 200)
-        elif bitrate >= 128:     # Standard quality
-            score += QualityScores.AUDIO_SCORES.get(128, 150)
-        elif bitrate >= 96:      # Acceptable quality
-            score += QualityScores.AUDIO_SCORES.get(96, 100)
-        else:                    # Lower quality
-            score += bitrate
+    if abr:
+        bitrate = extract_audio_bitrate(abr)
+        score += QualityScores.audio_score_for(bitrate)
             
     # Codec quality bonus
-    if hasattr(stream, 'audio_codec') and stream.audio_codec:
-        codec = stream.audio_codec.lower()
+    if audio_codec:
+        codec = audio_codec.lower()
         if 'opus' in codec:      # Opus (most efficient)
-            score += QualityScores.AUDIO_CODEC_BONUS.get('opus', 25)
+            score += AUDIO_CODEC_BONUS.get('opus', 25)
         elif 'aac' in codec:     # AAC (good quality)
-            score += QualityScores.AUDIO_CODEC_BONUS.get('aac', 20)
+            score += AUDIO_CODEC_BONUS.get('aac', 20)
         elif 'mp3' in codec:     # MP3 (compatible)
-            score += QualityScores.AUDIO_CODEC_BONUS.get('mp3', 10)
+            score += AUDIO_CODEC_BONUS.get('mp3', 10)
             
     return score
 
 def get_file_size_mb(stream) -> float:
     """Get file size in MB for a stream"""
-    if hasattr(stream, 'filesize') and stream.filesize:
-        return stream.filesize / (1024 * 1024)
+    filesize = getattr(stream, 'filesize', None)
+    if filesize:
+        return filesize * MB_PER_BYTE
     return 0.0
 
 def analyze_streams(yt: YouTube) -> Tuple[List[StreamAnalysis], List[StreamAnalysis], List[StreamAnalysis]]:
@@ -217,8 +215,12 @@ def analyze_streams(yt: YouTube) -> Tuple[List[StreamAnalysis], List[StreamAnaly
     audio_streams = []
     
     try:
+        # Classify all streams in a single pass over the stream list
+        progressive, video_only, audio_only = partition_streams(yt.streams)
+        prefetch_filesizes(progressive + video_only + audio_only)
+        
         # Analyze progressive streams (video + audio)
-        for stream in yt.streams.filter(progressive=True):
+        for stream in progressive:
             if stream.resolution:  # Only include streams with resolution
                 quality_score = calculate_video_quality_score(stream)
                 size_mb = get_file_size_mb(stream)
@@ -226,7 +228,7 @@ def analyze_streams(yt: YouTube) -> Tuple[List[StreamAnalysis], List[StreamAnaly
                 progressive_streams.append(analysis)
                 
         # Analyze video-only streams
-        for stream in yt.streams.filter(adaptive=True, only_video=True):
+        for stream in video_only:
             if stream.resolution:
                 quality_score = calculate_video_quality_score(stream)
                 size_mb = get_file_size_mb(stream)
@@ -234,129 +236,116 @@ def analyze_streams(yt: YouTube) -> Tuple[List[StreamAnalysis], List[StreamAnaly
                 video_streams.append(analysis)
                 
         # Analyze audio-only streams  
-        for stream in yt.streams.filter(only_audio=True):
+        for stream in audio_only:
             quality_score = calculate_audio_quality_score(stream)
             size_mb = get_file_size_mb(stream)
             analysis = StreamAnalysis(stream, 'audio', quality_score, size_mb)
             audio_streams.append(analysis)
             
         # Sort by quality score (descending)
-        progressive_streams.sort(key=lambda x: x.quality_score, reverse=True)
-        video_streams.sort(key=lambda x: x.quality_score, reverse=True)
-        audio_streams.sort(key=lambda x: x.quality_score, reverse=True)
+        progressive_streams.sort(key=_QUALITY_SCORE_KEY, reverse=True)
+        video_streams.sort(key=_QUALITY_SCORE_KEY, reverse=True)
+        audio_streams.sort(key=_QUALITY_SCORE_KEY, reverse=True)
         
-        logger.info(f"Analyzed streams: {len(progressive_streams)} progressive, {len(video_streams)} video, {len(audio_streams)} audio")
+        logger.info(
+            "Analyzed streams: %d progressive, %d video, %d audio",
+            len(progressive_streams), len(video_streams), len(audio_streams)
+        )
         
     except Exception as e:
-        logger.error(f"Error analyzing streams: {e}")
+        logger.error("Error analyzing streams: %s", e)
         
     return progressive_streams, video_streams, audio_streams
 
+def _merge_option(best_video: StreamAnalysis, best_audio: StreamAnalysis, audio_label: str) -> Dict[str, Any]:
+    """Build the smart selection result for merging a video-only and an audio-only stream"""
+    return {
+        'type': 'merge',
+        'video_stream': best_video.stream,
+        'audio_stream': best_audio.stream,
+        'video_itag': best_video.itag,
+        'audio_itag': best_audio.itag,
+        'estimated_size_mb': best_video.size_mb + best_audio.size_mb,
+        'quality_description': f"{best_video.stream.resolution} + {best_audio.stream.abr or audio_label}",
+        'merge_required': True
+    }
+
+def _progressive_option(best_progressive: StreamAnalysis, label: str) -> Dict[str, Any]:
+    """Build the smart selection result for a single progressive stream"""
+    return {
+        'type': 'progressive',
+        'video_stream': best_progressive.stream,
+        'audio_stream': None,
+        'video_itag': best_progressive.itag,
+        'audio_itag': None,
+        'estimated_size_mb': best_progressive.size_mb,
+        'quality_description': f"{best_progressive.stream.resolution} ({label})",
+        'merge_required': False
+    }
+
 def smart_select_best_option(yt: YouTube, prefer_progressive: bool = False) -> Optional[Dict[str, Any]]:
     """Intelligently select the best download option - prioritizes highest quality by default"""
     try:
         progressive_streams, video_streams, audio_streams = analyze_streams(yt)
         
-        # Debug logging
-        logger.info(f"Smart selection analysis:")
-        logger.info(f"  Progressive streams: {len(progressive_streams)}")
-        if progressive_streams:
-            logger.info(f"  Best progressive: {progressive_streams[0].stream.resolution} (score: {progressive_streams[0].quality_score})")
-        logger.info(f"  Video streams: {len(video_streams)}")
-        if video_streams:
-            logger.info(f"  Best video: {video_streams[0].stream.resolution} (score: {video_streams[0].quality_score})")
-        logger.info(f"  Audio streams: {len(audio_streams)}")
-        if audio_streams:
-            logger.info(f"  Best audio: {audio_streams[0].stream.abr} (score: {audio_streams[0].quality_score})")
-        logger.info(f"  Prefer progressive: {prefer_progressive}")
+        # Debug logging (skipped entirely when INFO is disabled)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Smart selection analysis:")
+            logger.info("  Progressive streams: %d", len(progressive_streams))
+            if progressive_streams:
+                logger.info("  Best progressive: %s (score: %s)", progressive_streams[0].stream.resolution, progressive_streams[0].quality_score)
+            logger.info("  Video streams: %d", len(video_streams))
+            if video_streams:
+                logger.info("  Best video: %s (score: %s)", video_streams[0].stream.resolution, video_streams[0].quality_score)
+            logger.info("  Audio streams: %d", len(audio_streams))
+            if audio_streams:
+                logger.info("  Best audio: %s (score: %s)", audio_streams[0].stream.abr, audio_streams[0].quality_score)
+            logger.info("  Prefer progressive: %s", prefer_progressive)
+        
+        # Resolve the best progressive stream's resolution once for options 1 and 2
+        best_progressive = progressive_streams[0] if progressive_streams else None
+        best_progressive_quality = (
+            extract_resolution_number(best_progressive.stream.resolution) if best_progressive is not None else 0
+        )
         
         # Option 1: Find best video + audio combination (PRIORITIZED for highest quality)
         if video_streams and audio_streams:
             best_video = video_streams[0]
             best_audio = audio_streams[0]
             
-            # Calculate combined size
-            combined_size = best_video.size_mb + best_audio.size_mb
-            
             # Check if this is significantly better than progressive option
-            best_progressive_quality = 0
-            if progressive_streams:
-                best_progressive_quality = extract_resolution_number(progressive_streams[0].stream.resolution)
-            
             best_video_quality = extract_resolution_number(best_video.stream.resolution)
             
-            logger.info(f"Quality comparison: Merge option {best_video_quality}p vs Progressive {best_progressive_quality}p")
+            logger.info("Quality comparison: Merge option %sp vs Progressive %sp", best_video_quality, best_progressive_quality)
             
             # If merge option is significantly better quality OR no good progressive available
             if (best_video_quality > best_progressive_quality * 1.5) or (best_progressive_quality < 720):
-                logger.info(f"Selecting MERGE option: {best_video.stream.resolution} + {best_audio.stream.abr}")
-                return {
-                    'type': 'merge',
-                    'video_stream': best_video.stream,
-                    'audio_stream': best_audio.stream,
-                    'video_itag': best_video.itag,
-                    'audio_itag': best_audio.itag,
-                    'estimated_size_mb': combined_size,
-                    'quality_description': f"{best_video.stream.resolution} + {best_audio.stream.abr or 'High Quality Audio'}",
-                    'merge_required': True
-                }
+                logger.info("Selecting MERGE option: %s + %s", best_video.stream.resolution, best_audio.stream.abr)
+                return _merge_option(best_video, best_audio, 'High Quality Audio')
             
         # Option 2: Use progressive stream only if specifically preferred AND high quality
-        if prefer_progressive and progressive_streams:
-            best_progressive = progressive_streams[0]
-            progressive_quality = extract_resolution_number(best_progressive.stream.resolution)
-            
+        if prefer_progressive and best_progressive is not None:
             # Only use progressive if it's at least 720p
-            if progressive_quality >= 720:
-                logger.info(f"Selecting PROGRESSIVE option: {best_progressive.stream.resolution}")
-                return {
-                    'type': 'progressive',
-                    'video_stream': best_progressive.stream,
-                    'audio_stream': None,
-                    'video_itag': best_progressive.itag,
-                    'audio_itag': None,
-                    'estimated_size_mb': best_progressive.size_mb,
-                    'quality_description': f"{best_progressive.stream.resolution} (Progressive)",
-                    'merge_required': False
-                }
+            if best_progressive_quality >= 720:
+                logger.info("Selecting PROGRESSIVE option: %s", best_progressive.stream.resolution)
+                return _progressive_option(best_progressive, 'Progressive')
             
         # Option 3: Fallback to best merge option if available
         if video_streams and audio_streams:
             best_video = video_streams[0]
             best_audio = audio_streams[0]
-            combined_size = best_video.size_mb + best_audio.size_mb
-            
-            logger.info(f"Selecting MERGE fallback: {best_video.stream.resolution} + {best_audio.stream.abr}")
-            return {
-                'type': 'merge',
-                'video_stream': best_video.stream,
-                'audio_stream': best_audio.stream,
-                'video_itag': best_video.itag,
-                'audio_itag': best_audio.itag,
-                'estimated_size_mb': combined_size,
-                'quality_description': f"{best_video.stream.resolution} + {best_audio.stream.abr or 'Audio'}",
-                'merge_required': True
-            }
+            logger.info("Selecting MERGE fallback: %s + %s", best_video.stream.resolution, best_audio.stream.abr)
+            return _merge_option(best_video, best_audio, 'Audio')
             
         # Option 4: Last resort - any progressive stream
-        if progressive_streams:
-            best_progressive = progressive_streams[0]
-            logger.info(f"Selecting PROGRESSIVE fallback: {best_progressive.stream.resolution}")
-            return {
-                'type': 'progressive',
-                'video_stream': best_progressive.stream,
-                'audio_stream': None,
-                'video_itag': best_progressive.itag,
-                'audio_itag': None,
-                'estimated_size_mb': best_progressive.size_mb,
-                'quality_description': f"{best_progressive.stream.resolution} (Progressive - Fallback)",
-                'merge_required': False
-            }
+        if best_progressive is not None:
+            logger.info("Selecting PROGRESSIVE fallback: %s", best_progressive.stream.resolution)
+            return _progressive_option(best_progressive, 'Progressive - Fallback')
             
         # No suitable streams found
         logger.warning("No suitable streams found for smart selection")
         return None
         
     except Exception as e:
-        logger.error(f"Error in smart selection: {e}")
+        logger.error("Error in smart selection: %s", e)
         return None
\ No newline at end of file
@@ -8,13 +8,15 @@ Handles all interactions with the PyTubeFix library and YouTube-specific operati
 
 import logging
 import os
-import re
 import tempfile
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
 
 from pytubefix import YouTube
 
+from app.config import MB_PER_BYTE
 from app.exceptions import (
     VideoNotFoundError,
     InvalidURLError,
@@ -23,10 +25,31 @@ from app.exceptions import (
     ServiceUnavailableError,
     TimeoutError
 )
+from app.models import extract_video_id as parse_video_id
+from services.smart_selection import extract_resolution_number
+from utils.cache import CacheManager
+from utils.helpers import (
+    SAFE_FILENAME_TABLE,
+    FileHelper,
+    ValidationHelper,
+    first_number,
+    partition_streams,
+    prefetch_filesizes
+)
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Fallback bitrate estimates (kbps) by minimum resolution, for streams without a known size
+_ESTIMATE_THRESHOLDS = (0, 480, 720, 1080)
+_ESTIMATE_BITRATES = (500, 800, 1500, 2500)
+
+# kbps x seconds -> MB
+_KBPS_SECONDS_TO_MB = 1 / (8 * 1024)
+
+# (value, error_code) pair returned by non-raising lookups; error_code is None on success
+YouTubeResult = Tuple[Optional[YouTube], Optional[str]]
+
 
 class YouTubeService:
     """Service class for YouTube video operations."""
@@ -34,6 +57,12 @@ class YouTubeService:
     def __init__(self):
         """Initialize the YouTube service."""
         self.timeout = 30  # Default timeout for YouTube operations
+        
+        # Loaded YouTube objects, so the info -> download flow fetches the watch page once
+        self._youtube_objects = CacheManager(ttl=300, max_size=512)
+        # Per-video locks so concurrent first requests for a video share one fetch
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._load_locks_guard = threading.Lock()
     
     def extract_video_id(self, url: str) -> Optional[str]:
         """
@@ -49,6 +78,10 @@ class YouTubeService:
             >>> extract_video_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
             'dQw4w9WgXcQ'
         """
+        video_id = parse_video_id(str(url))
+        if video_id:
+            return video_id
+        
         try:
             yt = YouTube(str(url))
             return yt.video_id
@@ -72,22 +105,101 @@ class YouTubeService:
             ServiceUnavailableError: If YouTube service is unavailable
         """
         try:
-            yt = YouTube(str(url))
-            # Force loading of video info to validate
-            _ = yt.title
-            return yt
+            return self._load_youtube_object(url)
         except Exception as e:
-            error_msg = str(e).lower()
+            error_code = self._classify_error(e)
             
-            if "not found" in error_msg or "unavailable" in error_msg:
+            if error_code == "VIDEO_NOT_FOUND":
                 raise VideoNotFoundError(url, str(e))
-            elif "invalid" in error_msg or "malformed" in error_msg:
+            elif error_code == "INVALID_URL":
                 raise InvalidURLError(url, str(e))
-            elif "timeout" in error_msg:
+            elif error_code == "TIMEOUT_ERROR":
                 raise TimeoutError("YouTube access", self.timeout, str(e))
             else:
                 raise ServiceUnavailableError("YouTube", str(e))
     
+    def try_create_youtube_object(self, url: str) -> YouTubeResult:
+        """
+        Create a YouTube object without raising on expected failures.
+        
+        Non-raising variant of create_youtube_object for hot paths where a
+        bad or unavailable video is an ordinary outcome.
+        
+        Args:
+            url: YouTube video URL
+            
+        Returns:
+            (YouTube object, None) on success, or (None, error_code) where
+            error_code is one of the YouTubeDownloaderError codes
+        """
+        try:
+            return self._load_youtube_object(url), None
+        except Exception as e:
+            error_code = self._classify_error(e)
+            logger.warning(f"Failed to load video {url} ({error_code}): {e}")
+            return None, error_code
+    
+    def _load_youtube_object(self, url: str) -> YouTube:
+        """
+        Get a loaded YouTube object, reusing one created in the last few minutes.
+        
+        Entries are keyed by video ID, so every URL spelling of a video shares
+        one object. Concurrent misses for the same video wait for a single
+        fetch. Failures are not cached, so a transient error is retried next time.
+        
+        Args:
+            url: YouTube video URL
+            
+        Returns:
+            YouTube object with its video info already fetched
+        """
+        url = str(url)
+        key = parse_video_id(url) or url
+        yt = self._youtube_objects.get(key)
+        if yt is not None:
+            return yt
+        
+        with self._load_locks_guard:
+            lock = self._load_locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                # Another thread may have loaded it while we waited
+                yt = self._youtube_objects.get(key)
+                if yt is None:
+                    yt = YouTube(url)
+                    # Force loading of video info to validate
+                    _ = yt.title
+                    self._youtube_objects.set(key, yt)
+                return yt
+        finally:
+            with self._load_locks_guard:
+                if self._load_locks.get(key) is lock:
+                    del self._load_locks[key]
+    
+    def cleanup_cache(self, now: Optional[float] = None) -> int:
+        """Drop expired YouTube objects, returning how many were removed."""
+        return self._youtube_objects.cleanup_expired(now)
+    
+    def _classify_error(self, error: Exception) -> str:
+        """
+        Map a PyTubeFix failure to an application error code.
+        
+        Args:
+            error: Exception raised while accessing YouTube
+            
+        Returns:
+            Error code string
+        """
+        error_msg = str(error).lower()
+        
+        if "not found" in error_msg or "unavailable" in error_msg:
+            return "VIDEO_NOT_FOUND"
+        elif "invalid" in error_msg or "malformed" in error_msg:
+            return "INVALID_URL"
+        elif "timeout" in error_msg:
+            return "TIMEOUT_ERROR"
+        return "SERVICE_UNAVAILABLE"
+    
     def get_video_metadata(self, yt: YouTube) -> Dict[str, Any]:
         """
         Extract comprehensive video metadata.
@@ -99,6 +211,7 @@ class YouTubeService:
             Dictionary containing video metadata
         """
         try:
+            description = getattr(yt, 'description', None)
             return {
                 'title': yt.title or "Unknown Title",
                 'duration': yt.length or 0,
@@ -106,8 +219,8 @@ class YouTubeService:
                 'uploader': yt.author or "Unknown",
                 'view_count': yt.views or 0,
                 'video_id': yt.video_id,
-                'description': getattr(yt, 'description', '')[:500] if hasattr(yt, 'description') else "",
-                'publish_date': str(getattr(yt, 'publish_date', '')) if hasattr(yt, 'publish_date') else ""
+                'description': description[:500] if description else "",
+                'publish_date': str(getattr(yt, 'publish_date', ''))
             }
         except Exception as e:
             logger.error(f"Error extracting video metadata: {e}")
@@ -117,7 +230,7 @@ class YouTubeService:
                 'thumbnail': "",
                 'uploader': "Unknown",
                 'view_count': 0,
-                'video_id': yt.video_id if hasattr(yt, 'video_id') else "",
+                'video_id': getattr(yt, 'video_id', ""),
                 'description': "",
                 'publish_date': ""
             }
@@ -132,12 +245,16 @@ class YouTubeService:
         Returns:
             List of stream information dictionaries
         """
-        streams = []
-        seen_formats = set()
+        # Keyed by format so duplicate quality/container pairs keep their first stream
+        streams: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
         
         try:
+            # Classify all streams in a single pass over the stream list
+            progressive_streams, video_streams, audio_streams = partition_streams(yt.streams)
+            prefetch_filesizes(progressive_streams + video_streams + audio_streams)
+            watch_url = str(yt.watch_url)
+            
             # Progressive streams (video+audio)
-            progressive_streams = yt.streams.filter(progressive=True)
             logger.info(f"Found {len(progressive_streams)} progressive streams")
             
             for stream in progressive_streams:
@@ -145,26 +262,21 @@ class YouTubeService:
                     continue
                     
                 quality = stream.resolution
-                format_key = f"video_prog_{quality}_{stream.mime_type.split('/')[-1]}"
+                fmt = stream.subtype or "mp4"
+                format_key = ('prog', quality, fmt)
                 
-                if format_key not in seen_formats:
-                    seen_formats.add(format_key)
-                    
-                    # Calculate file size
-                    filesize_str = self._get_filesize_str(stream)
-                    
-                    streams.append({
+                if format_key not in streams:
+                    streams[format_key] = {
                         "id": str(stream.itag),
                         "type": "video",
                         "quality": f"{quality} (with audio)",
-                        "format": stream.mime_type.split('/')[-1] if stream.mime_type else "mp4",
-                        "filesize": filesize_str,
+                        "format": fmt,
+                        "filesize": self._get_filesize_str(stream),
                         "codec": f"{stream.video_codec}, {stream.audio_codec}" if stream.video_codec and stream.audio_codec else "Unknown",
-                        "url": str(yt.watch_url)
-                    })
+                        "url": watch_url
+                    }
             
             # Video-only streams
-            video_streams = yt.streams.filter(adaptive=True, only_video=True)
             logger.info(f"Found {len(video_streams)} video-only streams")
             
             for stream in video_streams:
@@ -172,25 +284,21 @@ class YouTubeService:
                     continue
                     
                 quality = stream.resolution
-                format_key = f"video_only_{quality}_{stream.mime_type.split('/')[-1]}"
+                fmt = stream.subtype or "mp4"
+                format_key = ('video', quality, fmt)
                 
-                if format_key not in seen_formats:
-                    seen_formats.add(format_key)
-                    
-                    filesize_str = self._get_filesize_str(stream)
-                    
-                    streams.append({
+                if format_key not in streams:
+                    streams[format_key] = {
                         "id": str(stream.itag),
                         "type": "video",
                         "quality": f"{quality} (video only)",
-                        "format": stream.mime_type.split('/')[-1] if stream.mime_type else "mp4",
-                        "filesize": filesize_str,
+                        "format": fmt,
+                        "filesize": self._get_filesize_str(stream),
                         "codec": stream.video_codec or "Unknown",
-                        "url": str(yt.watch_url)
-                    })
+                        "url": watch_url
+                    }
             
             # Audio-only streams
-            audio_streams = yt.streams.filter(only_audio=True)
             logger.info(f"Found {len(audio_streams)} audio-only streams")
             
             for stream in audio_streams:
@@ -198,25 +306,22 @@ class YouTubeService:
                     continue
                     
                 quality = stream.abr
-                format_key = f"audio_{quality}_{stream.mime_type.split('/')[-1]}"
+                fmt = stream.subtype or "mp4"
+                format_key = ('audio', quality, fmt)
                 
-                if format_key not in seen_formats:
-                    seen_formats.add(format_key)
-                    
-                    filesize_str = self._get_filesize_str(stream)
-                    
-                    streams.append({
+                if format_key not in streams:
+                    streams[format_key] = {
                         "id": str(stream.itag),
                         "type": "audio",
                         "quality": quality,
-                        "format": stream.mime_type.split('/')[-1] if stream.mime_type else "mp4",
-                        "filesize": filesize_str,
+                        "format": fmt,
+                        "filesize": self._get_filesize_str(stream),
                         "codec": stream.audio_codec or "Unknown",
-                        "url": str(yt.watch_url)
-                    })
+                        "url": watch_url
+                    }
             
             logger.info(f"Total streams processed: {len(streams)}")
-            return streams
+            return list(streams.values())
             
         except Exception as e:
             logger.error(f"Error processing streams: {e}")
@@ -236,15 +341,17 @@ class YouTubeService:
         Raises:
             StreamNotFoundError: If stream is not found
         """
+        # Same format rule the request validation applies
+        if not ValidationHelper.is_valid_stream_id(stream_id):
+            raise StreamNotFoundError(stream_id, f"Invalid stream ID format: {stream_id}")
+        
         try:
             stream = yt.streams.get_by_itag(int(stream_id))
-            if not stream:
-                raise StreamNotFoundError(stream_id)
-            return stream
-        except ValueError:
-            raise StreamNotFoundError(stream_id, f"Invalid stream ID format: {stream_id}")
         except Exception as e:
             raise StreamNotFoundError(stream_id, str(e))
+        if not stream:
+            raise StreamNotFoundError(stream_id)
+        return stream
     
     def download_stream(self, stream, output_dir: str, filename: str) -> str:
         """
@@ -266,7 +373,7 @@ class YouTubeService:
             stream.download(output_path=output_dir, filename=filename)
             
             # Verify download
-            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            if not FileHelper.has_content(output_path):
                 raise DownloadError(f"Download failed - file not created or empty: {filename}")
             
             return output_path
@@ -286,7 +393,7 @@ class YouTubeService:
             Safe filename string
         """
         # Clean the title for filename
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_title = title.translate(SAFE_FILENAME_TABLE).rstrip()
         safe_title = safe_title[:max_length]  # Limit length
         
         if stream_id:
@@ -305,32 +412,25 @@ class YouTubeService:
         Returns:
             Estimated file size in MB
         """
-        if hasattr(stream, 'filesize') and stream.filesize:
-            return stream.filesize / (1024 * 1024)
+        filesize = getattr(stream, 'filesize', None)
+        if filesize:
+            return filesize * MB_PER_BYTE
         
         # Estimation based on bitrate and duration
         estimated_bitrate = 1000  # Default 1000 kbps
+        abr = getattr(stream, 'abr', None)
+        resolution = getattr(stream, 'resolution', None)
         
-        if hasattr(stream, 'abr') and stream.abr:
+        if abr:
             # Audio stream
-            bitrate_match = re.search(r'(\d+)', stream.abr)
-            if bitrate_match:
-                estimated_bitrate = int(bitrate_match.group(1))
-        elif hasattr(stream, 'resolution') and stream.resolution:
+            estimated_bitrate = first_number(abr) or estimated_bitrate
+        elif resolution:
             # Video stream - estimate based on resolution
-            res_num = self._extract_resolution_number(stream.resolution)
-            if res_num >= 1080:
-                estimated_bitrate = 2500  # 2.5 Mbps for 1080p
-            elif res_num >= 720:
-                estimated_bitrate = 1500   # 1.5 Mbps for 720p
-            elif res_num >= 480:
-                estimated_bitrate = 800    # 800 kbps for 480p
-            else:
-                estimated_bitrate = 500    # 500 kbps for lower
+            res_num = self._extract_resolution_number(resolution)
+            estimated_bitrate = _ESTIMATE_BITRATES[bisect_right(_ESTIMATE_THRESHOLDS, res_num) - 1]
         
         # Convert to MB: (bitrate in kbps * duration in seconds) / (8 * 1024)
-        estimated_mb = (estimated_bitrate * duration_seconds) / (8 * 1024)
-        return estimated_mb
+        return estimated_bitrate * duration_seconds * _KBPS_SECONDS_TO_MB
     
     def _get_filesize_str(self, stream) -> str:
         """
@@ -343,28 +443,17 @@ class YouTubeService:
             File size string (e.g., "25.4 MB")
         """
         try:
-            if hasattr(stream, 'filesize') and stream.filesize:
-                size_mb = stream.filesize / (1024 * 1024)
+            filesize = getattr(stream, 'filesize', None)
+            if filesize:
+                size_mb = filesize * MB_PER_BYTE
                 return f"{size_mb:.1f} MB"
             else:
                 return "Size unknown"
         except Exception:
             return "Size unknown"
     
-    def _extract_resolution_number(self, resolution_str: str) -> int:
-        """
-        Extract numeric resolution from resolution string.
-        
-        Args:
-            resolution_str: Resolution string (e.g., "1080p")
-            
-        Returns:
-            Numeric resolution value
-        """
-        if not resolution_str:
-            return 0
-        match = re.search(r'(\d+)', str(resolution_str))
-        return int(match.group(1)) if match else 0
+    # Same parser the smart selection ranking uses
+    _extract_resolution_number = staticmethod(extract_resolution_number)
 
 
 # Global service instance
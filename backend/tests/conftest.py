@@ -0,0 +1,14 @@
+"""
+Pytest configuration for the backend tests.
+
+Puts the backend directory on sys.path once per session so test modules can
+import app, services and utils directly.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
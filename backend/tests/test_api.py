@@ -3,15 +3,21 @@
 Test script for the YouTube Downloader API
 """
 
+import orjson
 import requests
 import json
+from requests.adapters import HTTPAdapter
 
 API_BASE = "http://localhost:8000"
 
+# One keep-alive session so each call reuses the connection to the local backend
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+
 def test_health():
     """Test health endpoint"""
     try:
-        response = requests.get(f"{API_BASE}/api/health")
+        response = SESSION.get(f"{API_BASE}/api/health", timeout=(3, 30))
         print(f"Health check: {response.status_code}")
         print(f"Response: {response.json()}")
         return response.status_code == 200
@@ -24,14 +30,15 @@ def test_video_info():
     test_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"  # Rick Roll for testing
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/api/video-info",
-            json={"url": test_url}
+            json={"url": test_url},
+            timeout=(3, 30)
         )
         print(f"Video info: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Title: {data['title']}")
             print(f"Duration: {data['duration']} seconds")
             print(f"Streams available: {len(data['streams'])}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test Async Segmented Downloader
+
+Unit tests for range-parallel downloads: splitting, assembling ranges at their
+offsets, and keeping the output file open until every write has finished.
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add parent directory to path for imports (already done by conftest.py under pytest)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.exceptions import DownloadError
+from services import async_downloader as downloader_module
+from services.async_downloader import AsyncSegmentedDownloader
+
+
+class FakeRangeResponse:
+    """Streamed response for one Range request."""
+    
+    def __init__(self, status_code: int, body: bytes):
+        self.status_code = status_code
+        self._body = body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def aiter_bytes(self, chunk_size: int):
+        for start in range(0, len(self._body), 4):
+            await asyncio.sleep(0)
+            yield self._body[start:start + 4]
+
+
+class FakeClient:
+    """HTTP client serving byte ranges of data; the range starting at fail_at gets HTTP 500."""
+    
+    def __init__(self, data: bytes, fail_at: int = None):
+        self.data = data
+        self.fail_at = fail_at
+    
+    async def head(self, url):
+        return SimpleNamespace(
+            headers={"content-length": str(len(self.data))},
+            raise_for_status=lambda: None
+        )
+    
+    def stream(self, method, url, headers):
+        start, end = (int(part) for part in headers["Range"][len("bytes="):].split("-"))
+        if start == self.fail_at:
+            return FakeRangeResponse(500, b"")
+        return FakeRangeResponse(206, self.data[start:end + 1])
+
+
+class TestAsyncSegmentedDownloader(unittest.IsolatedAsyncioTestCase):
+    """Test cases for segmented stream downloads."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = bytes(range(256)) * 4
+        self.downloader = AsyncSegmentedDownloader(segments=4, min_segment_size=16)
+        self.stream = SimpleNamespace(url="https://example.invalid/videoplayback")
+    
+    def tearDown(self):
+        """Remove downloaded files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_split_ranges_cover_file(self):
+        """Test that ranges are contiguous and cover every byte."""
+        ranges = self.downloader.split_ranges(1000)
+        
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], 999)
+        for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(next_start, end + 1)
+    
+    async def test_ranges_assembled_at_offsets(self):
+        """Test that parallel ranges reassemble into the original bytes."""
+        self.downloader._client = FakeClient(self.data)
+        
+        output_path = await self.downloader.download_stream(self.stream, self.temp_dir, "video.mp4")
+        
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+    
+    async def test_failed_range_closes_file_after_pending_writes(self):
+        """Test that no write reaches the file descriptor after it is closed."""
+        self.downloader._client = FakeClient(self.data, fail_at=256)
+        events = []
+        events_lock = threading.Lock()
+        real_write_at = downloader_module._write_at
+        real_close = os.close
+        
+        def slow_write_at(fd, data, offset):
+            time.sleep(0.02)  # Still writing when the failing range raises
+            with events_lock:
+                events.append("write")
+            real_write_at(fd, data, offset)
+        
+        def recording_close(fd):
+            with events_lock:
+                events.append("close")
+            real_close(fd)
+        
+        with patch.object(downloader_module, "_write_at", slow_write_at), \
+                patch.object(downloader_module.os, "close", recording_close):
+            with self.assertRaises(DownloadError):
+                await self.downloader.download_stream(self.stream, self.temp_dir, "video.mp4")
+            await asyncio.sleep(0.1)  # Give any orphaned write thread time to run
+        
+        self.assertIn("close", events)
+        self.assertEqual(events[-1], "close", "a write happened after the file was closed")
+        self.assertEqual(events.count("close"), 1)
+
+
+if __name__ == '__main__':
+    # Run the tests
+    unittest.main(verbosity=2)
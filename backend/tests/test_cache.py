@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test Cache Manager
+
+Unit tests for the in-memory CacheManager: LRU eviction, TTL expiry,
+expiry heap bookkeeping and atomic updates.
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path for imports (already done by conftest.py under pytest)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.cache import CacheManager
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCacheManager(unittest.TestCase):
+    """Test cases for CacheManager."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        clock_patcher = patch('utils.cache.time.monotonic', self.clock)
+        clock_patcher.start()
+        self.addCleanup(clock_patcher.stop)
+        self.cache = CacheManager(ttl=60, max_size=3)
+    
+    def test_lru_eviction_order(self):
+        """Test that the least recently used entry is evicted first."""
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key.upper())
+        
+        # Reading 'a' makes 'b' the least recently used entry
+        self.assertEqual(self.cache.get('a'), 'A')
+        self.cache.set('d', 'D')
+        
+        self.assertIsNone(self.cache.get('b'))
+        for key in ('a', 'c', 'd'):
+            with self.subTest(key=key):
+                self.assertEqual(self.cache.get(key), key.upper())
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+    
+    def test_overwrite_does_not_evict(self):
+        """Test that overwriting a key in a full cache keeps every other entry."""
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, 1)
+        
+        self.cache.set('a', 2)
+        
+        self.assertEqual(self.cache.get_stats()['evictions'], 0)
+        self.assertEqual(self.cache.get('a'), 2)
+        self.assertEqual(self.cache.get('b'), 1)
+    
+    def test_ttl_expiry(self):
+        """Test that entries expire once their TTL has passed."""
+        self.cache.set('a', 'A')
+        
+        self.clock.now += 59
+        self.assertEqual(self.cache.get('a'), 'A')
+        
+        self.clock.now += 1
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get_stats()['size'], 0)
+    
+    def test_cleanup_expired_removes_only_expired(self):
+        """Test that cleanup removes expired entries and keeps fresh ones."""
+        self.cache.set('old', 1)
+        self.clock.now += 30
+        self.cache.set('new', 2)
+        self.clock.now += 31
+        
+        self.assertEqual(self.cache.cleanup_expired(), 1)
+        self.assertIsNone(self.cache.get('old'))
+        self.assertEqual(self.cache.get('new'), 2)
+    
+    def test_cleanup_skips_stale_heap_records(self):
+        """Test that records left by overwrites and deletes don't remove live entries."""
+        self.cache.set('a', 1)
+        self.cache.set('b', 1)
+        self.clock.now += 30
+        # The first records for 'a' and 'b' are now stale
+        self.cache.set('a', 2)
+        self.cache.delete('b')
+        self.clock.now += 31
+        
+        self.assertEqual(self.cache.cleanup_expired(), 0)
+        self.assertEqual(self.cache.get('a'), 2)
+        
+        self.clock.now += 30
+        self.assertEqual(self.cache.cleanup_expired(), 1)
+        self.assertEqual(self.cache.get_stats()['size'], 0)
+    
+    def test_expiry_heap_stays_bounded(self):
+        """Test that repeated overwrites don't grow the expiry heap without limit."""
+        for i in range(100):
+            self.cache.set(f"key{i % 5}", i)
+        
+        self.assertLessEqual(len(self.cache._expiry_heap), 2 * self.cache.max_size)
+        self.assertEqual(self.cache.get('key4'), 99)
+    
+    def test_update_is_atomic(self):
+        """Test that concurrent updates to one key never lose an increment."""
+        threads_count = 8
+        increments = 500
+        barrier = threading.Barrier(threads_count)
+        
+        def worker():
+            barrier.wait()
+            for _ in range(increments):
+                self.cache.update('counter', lambda value: (value or 0) + 1)
+        
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.cache.get('counter'), threads_count * increments)
+    
+    def test_update_treats_expired_entry_as_missing(self):
+        """Test that update() passes None for an expired entry."""
+        self.cache.set('a', 5)
+        self.clock.now += 61
+        
+        seen = []
+        result = self.cache.update('a', lambda value: seen.append(value) or 1)
+        
+        self.assertEqual(seen, [None])
+        self.assertEqual(result, 1)
+
+
+if __name__ == '__main__':
+    # Run the tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test API Endpoints
+
+In-process endpoint tests using FastAPI's TestClient, with YouTube access
+mocked out so no network is needed.
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path for imports (already done by conftest.py under pytest)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.testclient import TestClient
+
+import main
+from app.exceptions import VideoNotFoundError
+
+UNAVAILABLE_URL = "https://www.youtube.com/watch?v=AAAAAAAAAAA"
+
+
+class TestSmartDownloadInfoEndpoint(unittest.TestCase):
+    """Test cases for POST /api/smart-download-info."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = TestClient(main.app)
+    
+    def test_unavailable_video_returns_404(self):
+        """Test that an unavailable video maps to 404 instead of a server error."""
+        with patch.object(
+            main.youtube_service, 'try_create_youtube_object',
+            return_value=(None, VideoNotFoundError.error_code)
+        ), patch.object(
+            main.youtube_service, 'create_youtube_object',
+            side_effect=VideoNotFoundError(UNAVAILABLE_URL)
+        ):
+            response = self.client.post(
+                "/api/smart-download-info",
+                json={"video_url": UNAVAILABLE_URL}
+            )
+        
+        self.assertEqual(response.status_code, 404)
+
+
+
+class TestContactEndpoint(unittest.TestCase):
+    """Test cases for the anti-bot checks on POST /api/contact."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = TestClient(main.app)
+        self.form = {
+            "name": "Jane Doe",
+            "email": "jane@example.com",
+            "message": "I need help with a download"
+        }
+    
+    def test_timing_check_applies_to_string_timestamps(self):
+        """Test that sending the form start time as a string doesn't skip the timing check."""
+        for form_start in (time.time(), str(time.time())):
+            with self.subTest(form_start=form_start):
+                response = self.client.post(
+                    "/api/contact", json={**self.form, "formStartTimestamp": form_start}
+                )
+                
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["detail"], "Form submitted too quickly")
+    
+    def test_unparseable_timestamp_rejected(self):
+        """Test that a timestamp that isn't a finite number is a 400."""
+        for form_start in ("soon", "nan", [1]):
+            with self.subTest(form_start=form_start):
+                response = self.client.post(
+                    "/api/contact", json={**self.form, "formStartTimestamp": form_start}
+                )
+                
+                self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    # Run the tests
+    unittest.main(verbosity=2)
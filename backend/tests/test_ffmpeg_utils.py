@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test FFmpeg Utilities
+
+Unit tests for batched merges: the combined FFmpeg command line and the
+per-job fallbacks. FFmpeg itself is replaced by a fake runner.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path for imports (already done by conftest.py under pytest)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils import ffmpeg_utils
+
+FFMPEG = '/opt/ffmpeg/ffmpeg'
+
+
+class FakeFFmpeg:
+    """Records each command and writes its outputs unless told to fail."""
+    
+    def __init__(self, returncodes=()):
+        self.commands = []
+        self._returncodes = list(returncodes)
+    
+    def __call__(self, cmd, timeout, cancel_event=None):
+        self.commands.append(cmd)
+        returncode = self._returncodes.pop(0) if self._returncodes else 0
+        if returncode == 0:
+            for arg in cmd:
+                if arg.endswith('_out.mp4'):
+                    with open(arg, 'wb') as f:
+                        f.write(b'merged')
+        return returncode, '' if returncode == 0 else 'boom'
+
+
+class TestMergeVideoAudioBatch(unittest.TestCase):
+    """Test cases for merge_video_audio_batch."""
+    
+    def setUp(self):
+        """Create input files and patch out FFmpeg discovery."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        
+        path_patcher = patch.object(ffmpeg_utils, '_resolve_ffmpeg_path', lambda: FFMPEG)
+        path_patcher.start()
+        self.addCleanup(path_patcher.stop)
+    
+    def _job(self, name, audio_suffix='.m4a', create=True):
+        """Build a (video, audio, output) job, creating the input files."""
+        video_path = os.path.join(self.temp_dir, f'{name}_video.mp4')
+        audio_path = os.path.join(self.temp_dir, f'{name}_audio{audio_suffix}')
+        if create:
+            for path in (video_path, audio_path):
+                with open(path, 'wb') as f:
+                    f.write(b'data')
+        return video_path, audio_path, os.path.join(self.temp_dir, f'{name}_out.mp4')
+    
+    def _merge(self, jobs, fake):
+        with patch.object(ffmpeg_utils, '_run_ffmpeg', fake):
+            return ffmpeg_utils.merge_video_audio_batch(jobs, cleanup_temp=False)
+    
+    def test_two_jobs_share_one_process(self):
+        """Test the argv of a two-job batch and that both outputs are reported."""
+        first, second = self._job('first'), self._job('second')
+        fake = FakeFFmpeg()
+        
+        results = self._merge([first, second], fake)
+        
+        self.assertEqual(results, [True, True])
+        self.assertEqual(fake.commands, [[
+            FFMPEG,
+            '-i', first[0], '-i', first[1],
+            '-i', second[0], '-i', second[1],
+            '-threads', str(ffmpeg_utils._ffmpeg_threads), '-y',
+            '-map', '0:v:0', '-map', '1:a:0', '-c', 'copy', '-shortest',
+            '-movflags', '+faststart', first[2],
+            '-map', '2:v:0', '-map', '3:a:0', '-c', 'copy', '-shortest',
+            '-movflags', '+faststart', second[2],
+        ]])
+    
+    def test_reencode_falls_back_to_single_merges(self):
+        """Test that audio needing re-encoding makes every job merge on its own."""
+        first, second = self._job('first'), self._job('second', audio_suffix='.webm')
+        fake = FakeFFmpeg()
+        
+        results = self._merge([first, second], fake)
+        
+        self.assertEqual(results, [True, True])
+        self.assertEqual(len(fake.commands), 2)
+        for cmd, job, audio_codec in zip(fake.commands, (first, second), ('copy', 'aac')):
+            with self.subTest(output=job[2]):
+                self.assertEqual(cmd[:5], [FFMPEG, '-i', job[0], '-i', job[1]])
+                self.assertIn(audio_codec, cmd[cmd.index('-c:a') + 1])
+                self.assertEqual(cmd[-1], job[2])
+    
+    def test_failed_batch_falls_back_to_single_merges(self):
+        """Test that a non-zero FFmpeg exit retries each job separately."""
+        jobs = [self._job('first'), self._job('second')]
+        fake = FakeFFmpeg(returncodes=[1])
+        
+        results = self._merge(jobs, fake)
+        
+        self.assertEqual(results, [True, True])
+        self.assertEqual(len(fake.commands), 3)
+        self.assertEqual([cmd[-1] for cmd in fake.commands[1:]], [job[2] for job in jobs])
+    
+    def test_missing_input_only_fails_its_job(self):
+        """Test that a job with missing inputs fails without sinking the others."""
+        jobs = [self._job('first', create=False), self._job('second')]
+        fake = FakeFFmpeg()
+        
+        results = self._merge(jobs, fake)
+        
+        self.assertEqual(results, [False, True])
+        self.assertEqual(len(fake.commands), 1)
+
+
+if __name__ == '__main__':
+    # Run the tests
+    unittest.main(verbosity=2)
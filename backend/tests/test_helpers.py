@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test Helper Utilities
+
+Unit tests for YouTube video ID extraction from URLs.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports (already done by conftest.py under pytest)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.helpers import URLHelper
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+class TestExtractYoutubeVideoId(unittest.TestCase):
+    """Test cases for URLHelper.extract_youtube_video_id."""
+    
+    def test_video_url_shapes(self):
+        """Test that every supported URL shape yields the video ID."""
+        urls = [
+            f"https://www.youtube.com/watch?v={VIDEO_ID}",
+            f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}&t=10",
+            f"https://youtu.be/{VIDEO_ID}?t=1",
+            f"https://www.youtube.com/embed/{VIDEO_ID}",
+            f"https://youtube.com/shorts/{VIDEO_ID}",
+            f"https://www.youtube.com/v/{VIDEO_ID}",
+            f"https://www.youtube.com/live/{VIDEO_ID}",
+            f"https://www.youtube.com/attribution_link?u=/watch%3Fv%3D{VIDEO_ID}%26feature",
+            VIDEO_ID,
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(URLHelper.extract_youtube_video_id(url), VIDEO_ID)
+    
+    def test_other_paths_are_not_video_ids(self):
+        """Test that 11-character segments of non-video paths are not taken as IDs."""
+        urls = [
+            "https://www.youtube.com/channel/abcdefghijk",
+            "https://www.youtube.com/user/abcdefghijk",
+            "https://www.youtube.com/c/abcdefghijk/videos",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIsNone(URLHelper.extract_youtube_video_id(url))
+
+
+if __name__ == '__main__':
+    # Run the tests
+    unittest.main(verbosity=2)
@@ -3,81 +3,161 @@
 Test script for the YouTube Downloader API with pytube
 """
 
+import argparse
+import os
+import queue
+import re
+import sys
+import threading
+from urllib.parse import unquote
+
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+# Add backend directory to path so the shared test helpers import
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from tests.video_info_cache import fetch_video_info
 
 API_BASE = "http://localhost:8000"
+TEST_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"  # Rick Roll for testing
+SPECIFIC_VIDEO_URL = "https://www.youtube.com/watch?v=GFTDR8_q63M"  # Checks the stream list improvements
+
+# Filename in a Content-Disposition header, plain or RFC 5987 (filename*=utf-8''...)
+CONTENT_DISPOSITION_FILENAME = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', re.IGNORECASE)
+
+# Set by --verbose; gates the per-stream listing and raw health response
+VERBOSE = False
+
+# One keep-alive session so each call reuses the connection to the local backend
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
 
 def test_health():
     """Test health endpoint"""
     try:
-        response = requests.get(f"{API_BASE}/")
+        response = SESSION.get(f"{API_BASE}/", timeout=(3, 30))
         print(f"✅ Health check: {response.status_code}")
-        print(f"Response: {response.json()}")
+        if VERBOSE:
+            print(f"Response: {response.json()}")
         return response.status_code == 200
     except Exception as e:
         print(f"❌ Health check failed: {e}")
         return False
 
-def test_video_info():
-    """Test video info endpoint"""
-    test_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"  # Rick Roll for testing
-    
+def stream_indicator(stream):
+    """🔊 for video with audio, 🔇 for video only, 🎵 for audio"""
+    quality = stream['quality']
+    if "with audio" in quality:
+        return "🔊"
+    if "video only" in quality:
+        return "🔇"
+    return "🎵"
+
+def probe_url(session, url, use_cache=True):
+    """Fetch video info for url and list its streams; returns the streams or None"""
     try:
-        response = requests.post(
-            f"{API_BASE}/api/video-info",
-            json={"url": test_url}
-        )
-        print(f"✅ Video info: {response.status_code}")
+        status_code, data = fetch_video_info(session, API_BASE, url, use_cache=use_cache)
+        print(f"✅ Video info: {status_code}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             print(f"Title: {data['title']}")
             print(f"Duration: {data['duration']} seconds")
             print(f"Streams available: {len(data['streams'])}")
             
-            for i, stream in enumerate(data['streams'][:5]):  # Show first 5 streams
-                print(f"  {i+1}. {stream['type']} {stream['quality']} ({stream['format']}) - {stream['filesize']} [ID: {stream['id']}]")
+            if VERBOSE:
+                # One write for the whole listing instead of a print per stream
+                sys.stdout.write("".join(
+                    f"  {i+1}. {stream_indicator(stream)} {stream['type']} {stream['quality']} ({stream['format']}) - {stream['filesize']} [ID: {stream['id']}]\n"
+                    for i, stream in enumerate(data['streams'])
+                ))
+                sys.stdout.flush()
             
-            return data['streams'][0]['id'] if data['streams'] else None
+            return data['streams']
         else:
-            print(f"❌ Error: {response.text}")
+            print(f"❌ Error: {data}")
             return None
             
     except Exception as e:
         print(f"❌ Video info test failed: {e}")
         return None
 
+def test_video_info():
+    """Test video info endpoint"""
+    streams = probe_url(SESSION, TEST_URL)
+    return streams[0]['id'] if streams else None
+
+def save_chunks_pipelined(chunks, f, max_bytes):
+    """
+    Write chunks on a background thread so receiving the next one overlaps the write.
+    
+    A size-2 queue bounds memory; a write error stops writing and is re-raised here.
+    """
+    pending = queue.Queue(maxsize=2)
+    errors = []
+    
+    def writer():
+        while True:
+            chunk = pending.get()
+            if chunk is None:
+                return
+            if not errors:
+                try:
+                    f.write(chunk)
+                except Exception as e:
+                    errors.append(e)  # Keep draining so the producer never blocks
+    
+    writer_thread = threading.Thread(target=writer, name="download-writer")
+    writer_thread.start()
+    downloaded = 0
+    try:
+        for chunk in chunks:
+            if errors:
+                break
+            if chunk:
+                pending.put(chunk)
+                downloaded += len(chunk)
+                if downloaded > max_bytes:
+                    break
+    finally:
+        pending.put(None)
+        writer_thread.join()
+    
+    if errors:
+        raise errors[0]
+    return downloaded
+
 def test_download(stream_id, video_url):
     """Test download endpoint"""
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/api/download",
             json={
                 "video_url": video_url,
                 "stream_id": stream_id
             },
-            stream=True
+            stream=True,
+            timeout=(3, 120)  # The backend fetches the whole stream before responding
         )
         
         print(f"Download test: {response.status_code}")
         
         if response.status_code == 200:
             # Get filename from headers
-            content_disposition = response.headers.get('content-disposition', '')
-            filename = 'test_download.mp4'
-            if 'filename=' in content_disposition:
-                filename = content_disposition.split('filename=')[-1].strip('"')
+            match = CONTENT_DISPOSITION_FILENAME.search(response.headers.get('content-disposition', ''))
+            # basename keeps a hostile header from writing outside the working directory
+            filename = os.path.basename(unquote(match.group(1))) if match else 'test_download.mp4'
             
-            # Save a small portion to test
-            with open(f"test_{filename}", "wb") as f:
-                downloaded = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if downloaded > 1024 * 1024:  # Stop after 1MB for test
-                            break
+            # Save a small portion to test (unbuffered: each chunk goes straight to os.write)
+            with open(f"test_{filename}", "wb", buffering=0) as f:
+                downloaded = save_chunks_pipelined(
+                    response.iter_content(chunk_size=256 * 1024),
+                    f,
+                    max_bytes=1024 * 1024  # Stop after 1MB for test
+                )
             
             print(f"✅ Download test successful: {downloaded} bytes saved as test_{filename}")
             return True
@@ -89,30 +169,51 @@ def test_download(stream_id, video_url):
         print(f"❌ Download test failed: {e}")
         return False
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Run the health check, probe each URL, then optionally test a download"""
+    parser = argparse.ArgumentParser(description="Smoke test the YouTube Downloader API")
+    parser.add_argument("--url", dest="urls", action="append",
+                        help="video URL to probe (repeatable; default: the two built-in test videos)")
+    parser.add_argument("--download", action=argparse.BooleanOptionalAction, default=True,
+                        help="download the first stream of the first URL")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always query /api/video-info instead of using cached responses")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="list every stream and print the raw health response")
+    args = parser.parse_args(argv)
+    
+    global VERBOSE
+    VERBOSE = args.verbose
+    urls = args.urls or [TEST_URL, SPECIFIC_VIDEO_URL]
+    
     print("🧪 Testing YouTube Downloader API with pytube")
     print("=" * 50)
     
     # Test health endpoint
     if not test_health():
         print("❌ Health check failed - backend not running?")
-        exit(1)
-    
-    print()
-    
-    # Test video info endpoint
-    stream_id = test_video_info()
-    if not stream_id:
-        print("❌ Video info test failed")
-        exit(1)
+        return 1
     
-    print()
+    # Test video info endpoint for every URL over the shared session
+    first_streams = None
+    for url in urls:
+        print(f"\n🔎 {url}")
+        streams = probe_url(SESSION, url, use_cache=not args.no_cache)
+        if not streams:
+            print("❌ Video info test failed")
+            return 1
+        first_streams = first_streams or streams
     
     # Test download
-    test_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
-    if test_download(stream_id, test_url):
-        print("✅ All tests passed!")
-    else:
-        print("❌ Download test failed")
+    if args.download:
+        print()
+        if test_download(first_streams[0]['id'], urls[0]):
+            print("✅ All tests passed!")
+        else:
+            print("❌ Download test failed")
     
-    print("\n🎉 API testing complete!")
\ No newline at end of file
+    print("\n🎉 API testing complete!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
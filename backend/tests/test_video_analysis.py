@@ -1,45 +1,26 @@
 #!/usr/bin/env python3
 """
 Test script for specific video to check stream improvements
+
+Thin wrapper around test_integration.py, which probes any number of URLs in
+one run over a shared session:
+
+    python tests/test_integration.py --url https://www.youtube.com/watch?v=GFTDR8_q63M --no-download -v
 """
 
-import requests
-import json
+import os
+import sys
+
+# Add backend directory to path so the shared test helpers import
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
 
-API_BASE = "http://localhost:8000"
+from tests.test_integration import SESSION, SPECIFIC_VIDEO_URL, main, probe_url
 
 def test_specific_video():
     """Test video info for the specific video with improved streams"""
-    test_url = "https://www.youtube.com/watch?v=GFTDR8_q63M"
-    
-    try:
-        response = requests.post(
-            f"{API_BASE}/api/video-info",
-            json={"url": test_url}
-        )
-        print(f"Video info: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"Title: {data['title']}")
-            print(f"Duration: {data['duration']} seconds")
-            print(f"Streams available: {len(data['streams'])}")
-            print("\nAvailable streams:")
-            
-            for i, stream in enumerate(data['streams']):
-                audio_indicator = "🔊" if "with audio" in stream['quality'] else "🔇" if "video only" in stream['quality'] else "🎵"
-                print(f"  {i+1}. {audio_indicator} {stream['type']} {stream['quality']} ({stream['format']}) - {stream['filesize']} [ID: {stream['id']}]")
-            
-            return data['streams']
-        else:
-            print(f"❌ Error: {response.text}")
-            return None
-            
-    except Exception as e:
-        print(f"❌ Video info test failed: {e}")
-        return None
+    return probe_url(SESSION, SPECIFIC_VIDEO_URL)
 
 if __name__ == "__main__":
-    print("🧪 Testing specific video with improved stream handling")
-    print("=" * 60)
-    test_specific_video()
\ No newline at end of file
+    sys.exit(main(["--url", SPECIFIC_VIDEO_URL, "--no-download", "--verbose", *sys.argv[1:]]))
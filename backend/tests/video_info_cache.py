@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of /api/video-info responses for the API test scripts
+
+Re-running the scripts against the same videos skips the backend's PyTubeFix
+round trip. Responses are kept for an hour under ~/.cache/yt-dl-tests/; pass
+use_cache=False (the scripts' --no-cache flag) to always hit the API.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+
+CACHE_DIR = Path.home() / ".cache" / "yt-dl-tests"
+CACHE_MAX_AGE = 3600  # Seconds a cached response stays fresh
+
+# Parsed responses already loaded in this process
+_parsed = {}
+
+
+def _cache_path(url):
+    return CACHE_DIR / f"{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}.json"
+
+
+def _read_cached(url):
+    """Parsed cached response for url, or None if missing or stale"""
+    if url in _parsed:
+        return _parsed[url]
+    path = _cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime >= CACHE_MAX_AGE:
+            return None
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    _parsed[url] = data
+    return data
+
+
+def _write_cached(url, data):
+    """Store a response atomically so a concurrent run never reads half a file"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=CACHE_DIR, suffix=".tmp", delete=False) as f:
+        f.write(orjson.dumps(data))
+    os.replace(f.name, _cache_path(url))
+    _parsed[url] = data
+
+
+def fetch_video_info(session, api_base, url, use_cache=True):
+    """
+    Get /api/video-info for url, from the cache when fresh.
+
+    Args:
+        use_cache: False skips the cache entirely, neither reading nor storing
+
+    Returns:
+        (status code, parsed JSON on 200 or the error body text otherwise)
+    """
+    if use_cache:
+        data = _read_cached(url)
+        if data is not None:
+            return 200, data
+
+    response = session.post(f"{api_base}/api/video-info", json={"url": url}, timeout=(3, 30))
+    if response.status_code != 200:
+        return response.status_code, response.text
+
+    data = orjson.loads(response.content)
+    if use_cache:
+        _write_cached(url, data)
+    return 200, data
@@ -6,10 +6,12 @@ Caching system for performance optimization including video stream analysis cach
 thread-safe operations, and cache management utilities.
 """
 
+import heapq
 import logging
 import threading
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from app.exceptions import CacheError
 
@@ -17,6 +19,16 @@ from app.exceptions import CacheError
 logger = logging.getLogger(__name__)
 
 
+class _CacheEntry:
+    """A cached value and the time it was stored."""
+    
+    __slots__ = ('timestamp', 'data')
+    
+    def __init__(self, timestamp: float, data: Any):
+        self.timestamp = timestamp
+        self.data = data
+
+
 class CacheManager:
     """Thread-safe cache manager for video analysis results."""
     
@@ -30,7 +42,11 @@ class CacheManager:
         """
         self.ttl = ttl
         self.max_size = max_size
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Ordered least to most recently used, so eviction pops from the front
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        # (stored timestamp, key) per set() call, oldest first; entries go stale
+        # when a key is overwritten or removed and are skipped during cleanup
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._lock = threading.Lock()
         self._stats = {
             'hits': 0,
@@ -50,21 +66,24 @@ class CacheManager:
         Returns:
             Cached data if valid, None if expired or not found
         """
+        # Read the clock before taking the lock to keep the critical section short
+        now = time.monotonic()
         with self._lock:
-            if key in self._cache:
-                cache_entry = self._cache[key]
-                if time.time() - cache_entry['timestamp'] < self.ttl:
+            cache_entry = self._cache.get(key)
+            if cache_entry is not None:
+                age = now - cache_entry.timestamp
+                if age < self.ttl:
+                    self._cache.move_to_end(key)
                     self._stats['hits'] += 1
-                    age = time.time() - cache_entry['timestamp']
-                    logger.debug(f"Cache HIT for key {key} (age: {age:.1f}s)")
-                    return cache_entry['data']
+                    logger.debug("Cache HIT for key %s (age: %.1fs)", key, age)
+                    return cache_entry.data
                 else:
                     # Clean expired entry
                     del self._cache[key]
-                    logger.debug(f"Cache EXPIRED for key {key}")
+                    logger.debug("Cache EXPIRED for key %s", key)
             
             self._stats['misses'] += 1
-            logger.debug(f"Cache MISS for key {key}")
+            logger.debug("Cache MISS for key %s", key)
             return None
     
     def set(self, key: str, data: Any) -> None:
@@ -75,17 +94,63 @@ class CacheManager:
             key: Cache key
             data: Data to cache
         """
+        timestamp = time.monotonic()
+        with self._lock:
+            self._store(key, data, timestamp)
+    
+    def update(self, key: str, updater: Callable[[Optional[Any]], Any]) -> Any:
+        """
+        Atomically replace an entry with a value derived from the current one.
+        
+        The read, updater call and store happen under a single lock acquisition,
+        so concurrent updates to the same key cannot lose each other's changes.
+        updater runs while the lock is held and must not use this cache.
+        
+        Args:
+            key: Cache key
+            updater: Called with the current data (None if missing or expired);
+                its return value is stored
+            
+        Returns:
+            The newly stored data
+        """
+        timestamp = time.monotonic()
         with self._lock:
-            # Check if cache is full and evict oldest entries if needed
-            if len(self._cache) >= self.max_size:
-                self._evict_oldest()
+            cache_entry = self._cache.get(key)
+            current = None
+            if cache_entry is not None and timestamp - cache_entry.timestamp < self.ttl:
+                current = cache_entry.data
             
-            self._cache[key] = {
-                'timestamp': time.time(),
-                'data': data
-            }
-            self._stats['stores'] += 1
-            logger.debug(f"Cache STORED for key {key} (total cached: {len(self._cache)})")
+            data = updater(current)
+            self._store(key, data, timestamp)
+            return data
+    
+    def _store(self, key: str, data: Any, timestamp: float) -> None:
+        """Store an entry; caller must hold the lock."""
+        # Check if cache is full and evict the least recently used entry if needed
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self.max_size:
+            self._evict_oldest()
+        
+        self._cache[key] = _CacheEntry(timestamp, data)
+        heapq.heappush(self._expiry_heap, (timestamp, key))
+        if len(self._expiry_heap) > 2 * self.max_size:
+            self._compact_expiry_heap()
+        self._stats['stores'] += 1
+        logger.debug("Cache STORED for key %s (total cached: %d)", key, len(self._cache))
+    
+    def _compact_expiry_heap(self) -> None:
+        """
+        Rebuild the expiry heap from the live entries; caller must hold the lock.
+        
+        Overwrites, deletes and LRU evictions leave stale records behind, so the
+        heap is rebuilt once it holds twice max_size records. That keeps it
+        bounded even if cleanup_expired() is never called, at amortized O(log n)
+        per store.
+        """
+        self._expiry_heap = [(entry.timestamp, key) for key, entry in self._cache.items()]
+        heapq.heapify(self._expiry_heap)
     
     def delete(self, key: str) -> bool:
         """
@@ -100,7 +165,7 @@ class CacheManager:
         with self._lock:
             if key in self._cache:
                 del self._cache[key]
-                logger.debug(f"Cache DELETED key {key}")
+                logger.debug("Cache DELETED key %s", key)
                 return True
             return False
     
@@ -109,41 +174,57 @@ class CacheManager:
         with self._lock:
             cache_size = len(self._cache)
             self._cache.clear()
+            self._expiry_heap.clear()
             logger.info(f"Cache CLEARED - removed {cache_size} entries")
     
-    def cleanup_expired(self) -> int:
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
         """
         Remove expired cache entries.
         
+        Only heap records past their TTL are visited, so the cost scales with
+        the number of expired stores rather than the cache size.
+        
+        Args:
+            now: time.monotonic() reading to expire against (defaults to the
+                current time), so several caches can share one snapshot
+        
         Returns:
             Number of expired entries removed
         """
+        current_time = time.monotonic() if now is None else now
+        
+        # Nothing is due unless the oldest record has expired; peek without the lock
+        oldest = self._expiry_heap[:1]
+        if not oldest or current_time - oldest[0][0] <= self.ttl:
+            return 0
+        
         with self._lock:
-            current_time = time.time()
-            expired_keys = [
-                k for k, v in self._cache.items()
-                if current_time - v['timestamp'] > self.ttl
-            ]
+            heap = self._expiry_heap
+            removed = 0
             
-            for key in expired_keys:
-                del self._cache[key]
+            while heap and current_time - heap[0][0] > self.ttl:
+                timestamp, key = heapq.heappop(heap)
+                entry = self._cache.get(key)
+                # Skip stale records for keys since overwritten or removed
+                if entry is not None and entry.timestamp == timestamp:
+                    del self._cache[key]
+                    removed += 1
             
-            if expired_keys:
+            if removed:
                 self._stats['cleanups'] += 1
-                logger.debug(f"Cache CLEANUP - removed {len(expired_keys)} expired entries (remaining: {len(self._cache)})")
+                logger.debug("Cache CLEANUP - removed %d expired entries (remaining: %d)", removed, len(self._cache))
             
-            return len(expired_keys)
+            return removed
     
     def _evict_oldest(self) -> None:
-        """Evict oldest cache entries when cache is full."""
+        """Evict the least recently used cache entry when cache is full."""
         if not self._cache:
             return
         
-        # Find and remove the oldest entry
-        oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k]['timestamp'])
-        del self._cache[oldest_key]
+        # Entries are kept in LRU order, so the first one is the eviction victim
+        oldest_key, _ = self._cache.popitem(last=False)
         self._stats['evictions'] += 1
-        logger.debug(f"Cache EVICTED oldest entry: {oldest_key}")
+        logger.debug("Cache EVICTED least recently used entry: %s", oldest_key)
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -153,18 +234,21 @@ class CacheManager:
             Dictionary containing cache statistics
         """
         with self._lock:
-            hit_rate = 0.0
-            total_requests = self._stats['hits'] + self._stats['misses']
-            if total_requests > 0:
-                hit_rate = self._stats['hits'] / total_requests
-            
-            return {
-                **self._stats.copy(),
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'ttl': self.ttl,
-                'hit_rate': hit_rate
-            }
+            stats = self._stats.copy()
+            size = len(self._cache)
+        
+        hit_rate = 0.0
+        total_requests = stats['hits'] + stats['misses']
+        if total_requests > 0:
+            hit_rate = stats['hits'] / total_requests
+        
+        return {
+            **stats,
+            'size': size,
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hit_rate': hit_rate
+        }
     
     def get_info(self) -> Dict[str, Any]:
         """
@@ -173,27 +257,32 @@ class CacheManager:
         Returns:
             Dictionary with cache configuration and current state
         """
+        # Snapshot under the lock; the age math runs after releasing it
         with self._lock:
-            current_time = time.time()
-            
-            # Calculate age distribution
-            ages = [current_time - entry['timestamp'] for entry in self._cache.values()]
-            
-            info = {
-                'configuration': {
-                    'ttl': self.ttl,
-                    'max_size': self.max_size
-                },
-                'current_state': {
-                    'size': len(self._cache),
-                    'oldest_entry_age': max(ages) if ages else 0,
-                    'newest_entry_age': min(ages) if ages else 0,
-                    'average_age': sum(ages) / len(ages) if ages else 0
-                },
-                'statistics': self.get_stats()
-            }
-            
-            return info
+            current_time = time.monotonic()
+            timestamps = [entry.timestamp for entry in self._cache.values()]
+        
+        # Calculate age distribution
+        if timestamps:
+            oldest_entry_age = current_time - min(timestamps)
+            newest_entry_age = current_time - max(timestamps)
+            average_age = current_time - sum(timestamps) / len(timestamps)
+        else:
+            oldest_entry_age = newest_entry_age = average_age = 0
+        
+        return {
+            'configuration': {
+                'ttl': self.ttl,
+                'max_size': self.max_size
+            },
+            'current_state': {
+                'size': len(timestamps),
+                'oldest_entry_age': oldest_entry_age,
+                'newest_entry_age': newest_entry_age,
+                'average_age': average_age
+            },
+            'statistics': self.get_stats()
+        }
 
 
 class VideoAnalysisCache:
@@ -230,41 +319,74 @@ class VideoAnalysisCache:
         """
         self.cache_manager.set(f"analysis:{video_id}", analysis_data)
     
-    def get_smart_selection(self, video_id: str) -> Optional[Dict]:
+    def get_smart_selection(self, video_id: str, prefer_progressive: bool = False) -> Optional[Dict]:
         """
         Get cached smart selection result.
         
         Args:
             video_id: YouTube video ID
+            prefer_progressive: Whether the selection was made preferring progressive streams
             
         Returns:
             Cached smart selection data or None
         """
         analysis = self.get_analysis(video_id)
-        return analysis.get('smart_selection') if analysis else None
+        return analysis.get(_smart_selection_slot(prefer_progressive)) if analysis else None
     
-    def cache_smart_selection(self, video_id: str, smart_selection_data: Dict) -> None:
+    def cache_smart_selection(
+        self, video_id: str, smart_selection_data: Dict, prefer_progressive: bool = False
+    ) -> None:
         """
         Cache smart selection data.
         
         Args:
             video_id: YouTube video ID
             smart_selection_data: Smart selection data to cache
+            prefer_progressive: Whether the selection was made preferring progressive streams
+        """
+        slot = _smart_selection_slot(prefer_progressive)
+        # Merge into the existing analysis (or a new one) in a single locked step
+        self.cache_manager.update(
+            f"analysis:{video_id}",
+            lambda analysis: {**(analysis or {}), slot: smart_selection_data}
+        )
+    
+    def get_video_info(self, video_id: str) -> Optional[Any]:
         """
-        # Get existing analysis or create new one
-        analysis = self.get_analysis(video_id) or {}
-        analysis['smart_selection'] = smart_selection_data
-        self.cache_analysis(video_id, analysis)
+        Get cached video metadata response.
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            Cached video metadata or None
+        """
+        return self.cache_manager.get(f"info:{video_id}")
+    
+    def cache_video_info(self, video_id: str, video_info: Any) -> None:
+        """
+        Cache video metadata response.
+        
+        Args:
+            video_id: YouTube video ID
+            video_info: Video metadata (with streams) to cache
+        """
+        self.cache_manager.set(f"info:{video_id}", video_info)
     
-    def cleanup(self) -> None:
-        """Clean up expired video analysis cache entries."""
-        self.cache_manager.cleanup_expired()
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Clean up expired video analysis cache entries, returning how many were removed."""
+        return self.cache_manager.cleanup_expired(now)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get video analysis cache statistics."""
         return self.cache_manager.get_stats()
 
 
+def _smart_selection_slot(prefer_progressive: bool) -> str:
+    """Analysis entry key for a smart selection made with the given preference."""
+    return 'smart_selection_progressive' if prefer_progressive else 'smart_selection'
+
+
 # Global cache instances
 video_cache = VideoAnalysisCache()
 general_cache = CacheManager()
@@ -288,15 +410,17 @@ def cleanup_all_caches() -> Dict[str, int]:
         Dictionary with cleanup statistics for each cache
     """
     results = {}
+    # One clock reading so both caches agree on what has expired
+    now = time.monotonic()
     
     try:
-        results['video_cache'] = video_cache.cleanup()
+        results['video_cache'] = video_cache.cleanup(now)
     except Exception as e:
         logger.error(f"Error cleaning video cache: {e}")
         results['video_cache'] = 0
     
     try:
-        results['general_cache'] = general_cache.cleanup_expired()
+        results['general_cache'] = general_cache.cleanup_expired(now)
     except Exception as e:
         logger.error(f"Error cleaning general cache: {e}")
         results['general_cache'] = 0
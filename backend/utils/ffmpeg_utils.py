@@ -6,91 +6,221 @@ import os
 import subprocess
 import tempfile
 import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Deque, List, Optional, Tuple
 import logging
 
+from app.config import settings
+from utils.helpers import FileHelper
+
 logger = logging.getLogger(__name__)
 
+# Bounds concurrent merges; each FFmpeg process gets an equal share of the CPUs
+_ffmpeg_slots = threading.BoundedSemaphore(settings.FFMPEG_CONCURRENCY)
+_ffmpeg_threads = max(1, (os.cpu_count() or 1) // settings.FFMPEG_CONCURRENCY)
+
+# Temp file removal runs here so callers don't wait on it; pending work finishes at interpreter exit
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ytdl-cleanup')
+
+# Audio codec name prefixes (ffprobe and YouTube spellings) each output container can stream-copy
+_COPYABLE_AUDIO = {
+    '.mp4': ('aac', 'mp4a'),
+    '.m4v': ('aac', 'mp4a'),
+    '.mov': ('aac', 'mp4a'),
+    '.mkv': ('aac', 'mp4a', 'opus', 'vorbis'),
+    '.webm': ('opus', 'vorbis'),
+}
+
+# Audio codecs YouTube ships in each download extension, so the common cases skip ffprobe
+_AUDIO_SUFFIX_CODECS = {
+    '.m4a': 'aac',
+    '.webm': 'opus',
+}
+
+# Output containers that cannot hold AAC, so a non-copyable source is rejected up front
+_NO_AAC_CONTAINERS = ('.webm',)
+
+# Seconds between checks for timeout/cancellation while FFmpeg runs
+PROCESS_POLL_INTERVAL = 0.25
+
+# FFmpeg stderr lines kept for error messages
+STDERR_TAIL_LINES = 200
+
+# MP4-family outputs that get their moov atom moved to the front
+_FASTSTART_CONTAINERS = ('.mp4', '.m4v', '.mov')
+
 class FFmpegError(Exception):
     """Exception raised when FFmpeg operations fail"""
     pass
 
-def check_ffmpeg_available() -> bool:
-    """Check if FFmpeg is available on the system"""
+def configure_ffmpeg_concurrency(max_merges: int) -> None:
+    """
+    Set how many merges may run at once (default: settings.FFMPEG_CONCURRENCY).
+    
+    Call before merges start; merges already waiting keep the old limit.
+    """
+    global _ffmpeg_slots, _ffmpeg_threads
+    max_merges = max(1, max_merges)
+    _ffmpeg_slots = threading.BoundedSemaphore(max_merges)
+    _ffmpeg_threads = max(1, (os.cpu_count() or 1) // max_merges)
+
+@lru_cache(maxsize=None)
+def _resolve_ffmpeg_path() -> Optional[str]:
+    """Locate the FFmpeg executable once: local project copy, imageio-ffmpeg, then system PATH"""
     # First check if ffmpeg is in the project directory
     local_ffmpeg = os.path.join(os.path.dirname(__file__), '..', 'ffmpeg', 'ffmpeg.exe')
-    if os.path.exists(local_ffmpeg):
-        return True
+    if FileHelper.is_executable_file(local_ffmpeg):
+        return local_ffmpeg
     
     # Check if imageio-ffmpeg is available (pip install imageio-ffmpeg)
     try:
         import imageio_ffmpeg as ffmpeg
         ffmpeg_exe = ffmpeg.get_ffmpeg_exe()
-        if os.path.exists(ffmpeg_exe):
-            return True
+        if FileHelper.is_executable_file(ffmpeg_exe):
+            return ffmpeg_exe
     except ImportError:
         pass
     
-    # Then check system PATH
-    try:
-        result = subprocess.run(
-            ['ffmpeg', '-version'], 
-            capture_output=True, 
-            text=True, 
-            timeout=10
-        )
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-        return False
+    # Then check system PATH (a path lookup, no need to spawn the binary)
+    return shutil.which('ffmpeg')
+
+def check_ffmpeg_available() -> bool:
+    """Check if FFmpeg is available on the system"""
+    return _resolve_ffmpeg_path() is not None
 
+@lru_cache(maxsize=None)
 def get_ffmpeg_info() -> Optional[str]:
-    """Get FFmpeg version information"""
-    # Check imageio-ffmpeg first
-    try:
-        import imageio_ffmpeg as ffmpeg
-        ffmpeg_exe = ffmpeg.get_ffmpeg_exe()
-        if os.path.exists(ffmpeg_exe):
-            result = subprocess.run(
-                [ffmpeg_exe, '-version'], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if line.startswith('ffmpeg version'):
-                        return line.strip() + " (via imageio-ffmpeg)"
-    except (ImportError, subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-        pass
+    """Get FFmpeg version information (probed once per process)"""
+    ffmpeg_cmd = _resolve_ffmpeg_path()
+    if ffmpeg_cmd is None:
+        return None
     
-    # Check system PATH
+    try:
+        process = subprocess.Popen(
+            [ffmpeg_cmd, '-version'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+        try:
+            # Only the first line holds the version; skip the build configuration
+            line = process.stdout.readline().strip()
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+        
+        if line.startswith('ffmpeg version'):
+            if 'imageio' in ffmpeg_cmd:
+                return line + " (via imageio-ffmpeg)"
+            return line
+        return None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def reset_ffmpeg_cache() -> None:
+    """Forget the cached FFmpeg path and version so the next call probes again"""
+    _resolve_ffmpeg_path.cache_clear()
+    get_ffmpeg_info.cache_clear()
+
+def _probe_audio_codec(ffmpeg_cmd: str, audio_path: str) -> Optional[str]:
+    """Read the first audio stream's codec name with ffprobe (None if unavailable)"""
+    ffmpeg_dir, ffmpeg_name = os.path.split(ffmpeg_cmd)
+    ffprobe_cmd = os.path.join(ffmpeg_dir, ffmpeg_name.replace('ffmpeg', 'ffprobe'))
     try:
         result = subprocess.run(
-            ['ffmpeg', '-version'], 
-            capture_output=True, 
-            text=True, 
+            [ffprobe_cmd, '-v', 'error', '-select_streams', 'a:0',
+             '-show_entries', 'stream=codec_name', '-of', 'csv=p=0', audio_path],
+            capture_output=True,
+            text=True,
             timeout=10
         )
-        if result.returncode == 0:
-            # Extract just the version line
-            lines = result.stdout.split('\n')
-            for line in lines:
-                if line.startswith('ffmpeg version'):
-                    return line.strip()
-        return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip() or None
     except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
         return None
 
+def _source_audio_codec(ffmpeg_cmd: str, audio_path: str) -> Optional[str]:
+    """Audio codec of a downloaded file, from its extension when known, else ffprobe"""
+    suffix_codec = _AUDIO_SUFFIX_CODECS.get(Path(audio_path).suffix.lower())
+    return suffix_codec or _probe_audio_codec(ffmpeg_cmd, audio_path)
+
+def _run_ffmpeg(
+    cmd: List[str],
+    timeout: float,
+    cancel_event: Optional[threading.Event] = None
+) -> Tuple[int, str]:
+    """
+    Run FFmpeg, keeping only the tail of its stderr.
+    
+    stderr is drained line by line into a bounded buffer, so verbose output
+    never accumulates in memory, and the process is polled so a timeout or
+    cancel_event kills it promptly.
+    
+    Returns:
+        (return code, last stderr lines joined with newlines)
+    
+    Raises:
+        subprocess.TimeoutExpired: If FFmpeg runs longer than timeout seconds
+        FFmpegError: If cancel_event is set while FFmpeg is running
+    """
+    stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace'
+    )
+    reader = threading.Thread(
+        target=lambda: stderr_tail.extend(line.rstrip() for line in process.stderr),
+        name='ffmpeg-stderr',
+        daemon=True
+    )
+    reader.start()
+    
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                returncode = process.wait(timeout=PROCESS_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise FFmpegError("FFmpeg merge cancelled")
+                if time.monotonic() >= deadline:
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        reader.join()
+        process.stderr.close()
+    
+    return returncode, '\n'.join(stderr_tail)
+
 def merge_video_audio(
     video_path: str, 
     audio_path: str, 
     output_path: str,
-    cleanup_temp: bool = True
+    cleanup_temp: bool = True,
+    source_audio_codec: Optional[str] = None,
+    cancel_event: Optional[threading.Event] = None
 ) -> bool:
-    """Merge video and audio files using FFmpeg"""
-    if not check_ffmpeg_available():
+    """
+    Merge video and audio files using FFmpeg.
+    
+    Audio is stream-copied when the output container can hold it as is (AAC
+    into MP4, AAC/Opus into Matroska/WebM) and encoded to AAC otherwise.
+    Pass source_audio_codec (e.g. 'mp4a.40.2') when known; otherwise it is
+    inferred from the .m4a/.webm extension, with ffprobe as the last resort.
+    WebM outputs whose audio would need re-encoding are rejected up front.
+    Setting cancel_event stops a running merge and raises FFmpegError.
+    """
+    ffmpeg_cmd = _resolve_ffmpeg_path()
+    if ffmpeg_cmd is None:
         raise FFmpegError("FFmpeg is not available on this system")
         
     if not os.path.exists(video_path):
@@ -99,32 +229,31 @@ def merge_video_audio(
     if not os.path.exists(audio_path):
         raise FFmpegError(f"Audio file not found: {audio_path}")
     
-    # Determine which FFmpeg executable to use
-    ffmpeg_cmd = 'ffmpeg'  # Default to system PATH
-    
-    # Check if imageio-ffmpeg is available
-    try:
-        import imageio_ffmpeg as ffmpeg
-        ffmpeg_exe = ffmpeg.get_ffmpeg_exe()
-        if os.path.exists(ffmpeg_exe):
-            ffmpeg_cmd = ffmpeg_exe
-    except ImportError:
-        pass
-    
-    # Check local project installation
-    local_ffmpeg = os.path.join(os.path.dirname(__file__), '..', 'ffmpeg', 'ffmpeg.exe')
-    if os.path.exists(local_ffmpeg):
-        ffmpeg_cmd = local_ffmpeg
-    
     try:
+        container = os.path.splitext(output_path)[1].lower()
+        audio_codec = source_audio_codec or _source_audio_codec(ffmpeg_cmd, audio_path)
+        copy_audio = bool(audio_codec) and audio_codec.lower().startswith(
+            _COPYABLE_AUDIO.get(container, ())
+        )
+        if not copy_audio and container in _NO_AAC_CONTAINERS:
+            raise FFmpegError(
+                f"Audio codec {audio_codec or 'unknown'} cannot be stored in {container}; use .mkv or .mp4"
+            )
+        
         # FFmpeg command to merge video and audio
         cmd = [
             ffmpeg_cmd,
             '-i', video_path,  # Input video
             '-i', audio_path,  # Input audio
+            '-threads', str(_ffmpeg_threads),  # This merge's share of the CPUs
             '-c:v', 'copy',    # Copy video codec (no re-encoding)
-            '-c:a', 'aac',     # Encode audio to AAC (widely compatible)
+            # Remux compatible audio as is; otherwise encode to AAC (widely compatible)
+            '-c:a', 'copy' if copy_audio else 'aac',
             '-shortest',       # Match shortest stream duration
+        ]
+        if container in _FASTSTART_CONTAINERS:
+            cmd += ['-movflags', '+faststart']  # Index up front so playback starts before full download
+        cmd += [
             '-y',              # Overwrite output file if exists
             output_path        # Output file
         ]
@@ -132,43 +261,124 @@ def merge_video_audio(
         logger.info(f"Starting FFmpeg merge: {video_path} + {audio_path} -> {output_path}")
         logger.info(f"Using FFmpeg executable: {ffmpeg_cmd}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout for large files
-        )
+        with _ffmpeg_slots:
+            returncode, stderr_tail = _run_ffmpeg(
+                cmd,
+                timeout=300,  # 5 minute timeout for large files
+                cancel_event=cancel_event
+            )
         
-        if result.returncode != 0:
-            logger.error(f"FFmpeg merge failed: {result.stderr}")
-            raise FFmpegError(f"FFmpeg merge failed: {result.stderr}")
+        if returncode != 0:
+            logger.error(f"FFmpeg merge failed: {stderr_tail}")
+            raise FFmpegError(f"FFmpeg merge failed: {stderr_tail}")
             
         # Verify output file was created and has content
-        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        if not FileHelper.has_content(output_path):
             raise FFmpegError("Output file was not created or is empty")
             
         logger.info(f"FFmpeg merge successful: {output_path}")
         
-        # Cleanup temporary files if requested
+        # Cleanup temporary files if requested (in the background)
         if cleanup_temp:
-            try:
-                if os.path.exists(video_path):
-                    os.remove(video_path)
-                    logger.debug(f"Cleaned up temporary video file: {video_path}")
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-                    logger.debug(f"Cleaned up temporary audio file: {audio_path}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temporary files: {e}")
+            _cleanup_executor.submit(_remove_files, video_path, audio_path)
                 
         return True
         
     except subprocess.TimeoutExpired:
         raise FFmpegError("FFmpeg merge timed out (file too large?)")
+    except FFmpegError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during FFmpeg merge: {e}")
         raise FFmpegError(f"Merge failed: {str(e)}")
 
+def merge_video_audio_batch(
+    jobs: List[Tuple[str, str, str]],
+    cleanup_temp: bool = True,
+    cancel_event: Optional[threading.Event] = None
+) -> List[bool]:
+    """
+    Merge several (video_path, audio_path, output_path) jobs with one FFmpeg process.
+    
+    Every pair becomes two inputs mapped to its own output, so N merges pay for
+    a single process start. If any job's audio has to be re-encoded, or the
+    combined run fails, each job is merged on its own with merge_video_audio
+    so one bad input doesn't sink the rest.
+    
+    Returns:
+        One flag per job, in order: True if that output was written
+    """
+    if len(jobs) <= 1:
+        return [_merge_job(job, cleanup_temp, cancel_event) for job in jobs]
+    
+    ffmpeg_cmd = _resolve_ffmpeg_path()
+    if ffmpeg_cmd is None:
+        raise FFmpegError("FFmpeg is not available on this system")
+    
+    for video_path, audio_path, output_path in jobs:
+        if not (os.path.exists(video_path) and os.path.exists(audio_path)):
+            return [_merge_job(job, cleanup_temp, cancel_event) for job in jobs]
+        container = os.path.splitext(output_path)[1].lower()
+        audio_codec = _source_audio_codec(ffmpeg_cmd, audio_path)
+        if not (audio_codec and audio_codec.lower().startswith(_COPYABLE_AUDIO.get(container, ()))):
+            return [_merge_job(job, cleanup_temp, cancel_event) for job in jobs]
+    
+    cmd = [ffmpeg_cmd]
+    for video_path, audio_path, _ in jobs:
+        cmd += ['-i', video_path, '-i', audio_path]
+    cmd += ['-threads', str(_ffmpeg_threads), '-y']
+    for index, (_, _, output_path) in enumerate(jobs):
+        # Inputs 2i and 2i+1 are this job's video and audio
+        cmd += ['-map', f'{2 * index}:v:0', '-map', f'{2 * index + 1}:a:0', '-c', 'copy', '-shortest']
+        if os.path.splitext(output_path)[1].lower() in _FASTSTART_CONTAINERS:
+            cmd += ['-movflags', '+faststart']
+        cmd.append(output_path)
+    
+    logger.info(f"Starting batched FFmpeg merge of {len(jobs)} jobs")
+    
+    try:
+        with _ffmpeg_slots:
+            returncode, stderr_tail = _run_ffmpeg(
+                cmd,
+                timeout=300 * len(jobs),  # Same 5 minute allowance per merge
+                cancel_event=cancel_event
+            )
+    except subprocess.TimeoutExpired:
+        raise FFmpegError("FFmpeg batch merge timed out (files too large?)")
+    
+    if returncode != 0:
+        logger.warning(f"Batched FFmpeg merge failed, merging jobs one by one: {stderr_tail}")
+        return [_merge_job(job, cleanup_temp, cancel_event) for job in jobs]
+    
+    results = []
+    for video_path, audio_path, output_path in jobs:
+        merged = FileHelper.has_content(output_path)
+        if merged and cleanup_temp:
+            _cleanup_executor.submit(_remove_files, video_path, audio_path)
+        results.append(merged)
+    
+    logger.info(f"Batched FFmpeg merge finished: {sum(results)}/{len(jobs)} outputs written")
+    return results
+
+def _merge_job(
+    job: Tuple[str, str, str],
+    cleanup_temp: bool,
+    cancel_event: Optional[threading.Event]
+) -> bool:
+    """Merge one batch job on its own, reporting failure as False"""
+    video_path, audio_path, output_path = job
+    try:
+        return merge_video_audio(
+            video_path, audio_path, output_path,
+            cleanup_temp=cleanup_temp,
+            cancel_event=cancel_event
+        )
+    except FFmpegError as e:
+        if cancel_event is not None and cancel_event.is_set():
+            raise
+        logger.error(f"Merge failed for {output_path}: {e}")
+        return False
+
 def create_temp_merge_dir() -> str:
     """Create a temporary directory for merge operations"""
     temp_dir = tempfile.mkdtemp(prefix="ytdl_merge_")
@@ -176,10 +386,26 @@ def create_temp_merge_dir() -> str:
     return temp_dir
 
 def cleanup_merge_dir(temp_dir: str) -> None:
-    """Cleanup temporary merge directory and all contents"""
+    """Schedule removal of a temporary merge directory and all contents; returns immediately"""
+    _cleanup_executor.submit(_remove_dir, temp_dir)
+
+def _remove_dir(temp_dir: str) -> None:
+    """Remove a merge directory tree (runs on the cleanup pool)"""
     try:
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-            logger.debug(f"Cleaned up merge directory: {temp_dir}")
+        shutil.rmtree(temp_dir)
+        logger.debug(f"Cleaned up merge directory: {temp_dir}")
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        logger.warning(f"Failed to cleanup merge directory {temp_dir}: {e}")
\ No newline at end of file
+        logger.warning(f"Failed to cleanup merge directory {temp_dir}: {e}")
+
+def _remove_files(*file_paths: str) -> None:
+    """Remove temporary files (runs on the cleanup pool)"""
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+            logger.debug(f"Cleaned up temporary file: {file_path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to cleanup temporary file {file_path}: {e}")
\ No newline at end of file
@@ -6,17 +6,176 @@ General utility functions for the YouTube Downloader API including file operatio
 string manipulation, validation, and other common operations.
 """
 
+import gzip
 import logging
 import os
 import re
+import shutil
+import stat
 import tempfile
-from typing import Any, Dict, List, Optional
-from urllib.parse import urlparse, parse_qs
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import ParseResult, urlparse, parse_qs
+
+from app.config import FPS_BONUS, QualityScores, settings
+
+# Optional Brotli support (pip install brotli); gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
 
+class _SafeFilenameTable(dict):
+    """
+    str.translate() table that keeps alphanumerics, spaces, '-' and '_'.
+    
+    Unicode alphanumerics can't be enumerated up front, so each code point is
+    classified on first sight and memoized; later lookups stay in C.
+    """
+    
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        mapped = codepoint if char.isalnum() or char in " -_" else None
+        self[codepoint] = mapped
+        return mapped
+
+
+# Shared translation table for filename sanitizing
+SAFE_FILENAME_TABLE = _SafeFilenameTable()
+
+# Path-unsafe characters become '_' and control characters are dropped
+INVALID_FILENAME_TABLE = {
+    **str.maketrans('<>:"/\\|?*', '_' * 9),
+    **dict.fromkeys(range(32)),
+}
+
+# File extension for each MIME subtype YouTube streams use
+MIME_SUBTYPE_EXTENSIONS = MappingProxyType({
+    'mp4': 'mp4',
+    'm4a': 'mp4',
+    'webm': 'webm',
+    'mpeg': 'mp3',
+    'mp3': 'mp3',
+    'aac': 'aac',
+    '3gpp': '3gp',
+})
+
+# First run of digits in stream labels such as '1080p60' or '128kbps'
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# YouTube video ID in any URL shape (watch?v=, vi=, youtu.be/, /embed/, /shorts/,
+# /v/, /live/, URL-encoded attribution links), ending at a delimiter or the end of
+# the URL. Path forms need a known prefix so e.g. /channel/<11 chars> never matches.
+YOUTUBE_ID_PATTERN = re.compile(
+    r'(?:v=|vi=|youtu\.be/|/embed/|/shorts/|/v/|/live/|%3D)([0-9A-Za-z_-]{11})(?:[?&/#%]|$)'
+)
+
+# A bare 11-character video ID
+YOUTUBE_BARE_ID_PATTERN = re.compile(r'[0-9A-Za-z_-]{11}')
+
+# Canonical watch URL form produced by URLHelper.normalize_youtube_url
+CANONICAL_WATCH_URL_PREFIX = "https://www.youtube.com/watch?v="
+CANONICAL_WATCH_URL_LENGTH = len(CANONICAL_WATCH_URL_PREFIX) + 11
+
+
+@lru_cache(maxsize=1024)
+def _youtube_video_id(url: str) -> Optional[str]:
+    """Memoized video ID lookup behind URLHelper.extract_youtube_video_id."""
+    # A bare ID needs no URL parsing
+    if len(url) == 11 and YOUTUBE_BARE_ID_PATTERN.fullmatch(url):
+        return url
+    
+    match = YOUTUBE_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+@lru_cache(maxsize=1024)
+def _parsed(url: str) -> ParseResult:
+    """Memoized urlparse for URLs that are validated repeatedly."""
+    return urlparse(url)
+
+
+@lru_cache(maxsize=256)
+def first_number(label: Any) -> int:
+    """
+    Parse the first run of digits in a stream label ('720p60' -> 720).
+    
+    Stream labels come from a small fixed vocabulary, so results are memoized
+    and repeat lookups never reach the regex engine.
+    
+    Args:
+        label: Resolution or bitrate label (non-strings are converted with str())
+        
+    Returns:
+        The parsed number, or 0 if the label has no digits
+    """
+    match = DIGITS_PATTERN.search(label if isinstance(label, str) else str(label))
+    return int(match.group()) if match else 0
+
+
+def partition_streams(streams: Iterable[Any]) -> Tuple[List[Any], List[Any], List[Any]]:
+    """
+    Split PyTubeFix streams into progressive, video-only and audio-only lists.
+    
+    One pass over the stream list with the same predicates as
+    filter(progressive=True), filter(adaptive=True, only_video=True) and
+    filter(only_audio=True); each list keeps the original stream order.
+    
+    Args:
+        streams: Stream objects (e.g. yt.streams)
+        
+    Returns:
+        Tuple of (progressive, video_only, audio_only) stream lists
+    """
+    progressive, video_only, audio_only = [], [], []
+    for stream in streams:
+        if stream.is_progressive:
+            progressive.append(stream)
+        elif stream.includes_video_track:
+            if not stream.includes_audio_track:
+                video_only.append(stream)
+        elif stream.includes_audio_track:
+            audio_only.append(stream)
+    return progressive, video_only, audio_only
+
+
+# Dedicated pool: callers already run on the request worker pool, so borrowing it could deadlock
+_FILESIZE_POOL = ThreadPoolExecutor(
+    max_workers=settings.FILESIZE_PREFETCH_WORKERS, thread_name_prefix="filesize"
+)
+
+
+def prefetch_filesizes(streams: List[Any]) -> None:
+    """
+    Resolve stream.filesize for many streams concurrently.
+    
+    PyTubeFix falls back to an HTTP HEAD request (then caches the result on
+    the stream) when a stream's size isn't in the player response, so reading
+    sizes one by one serializes those round-trips. Errors are ignored here
+    and resurface when the caller reads the attribute itself.
+    
+    Args:
+        streams: Stream objects whose sizes are about to be read
+    """
+    if len(streams) > 1:
+        list(_FILESIZE_POOL.map(_read_filesize, streams))
+
+
+def _read_filesize(stream: Any) -> None:
+    """Touch stream.filesize so PyTubeFix fetches and caches it."""
+    try:
+        getattr(stream, 'filesize', None)
+    except Exception:
+        pass
+
+
 class FileHelper:
     """Helper class for file operations."""
     
@@ -34,7 +193,7 @@ class FileHelper:
             Safe filename string
         """
         # Remove problematic characters and clean the title
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_title = title.translate(SAFE_FILENAME_TABLE).rstrip()
         safe_title = safe_title[:max_length]  # Limit length
         
         # Remove extra whitespace
@@ -59,14 +218,11 @@ class FileHelper:
             File extension string (without dot)
         """
         if mime_type:
-            if 'mp4' in mime_type.lower():
-                return 'mp4'
-            elif 'webm' in mime_type.lower():
-                return 'webm'
-            elif 'mp3' in mime_type.lower():
-                return 'mp3'
-            elif 'aac' in mime_type.lower():
-                return 'aac'
+            # 'video/mp4; codecs="avc1"' -> 'mp4'
+            subtype = mime_type.partition(';')[0].rpartition('/')[2].strip().lower()
+            extension = MIME_SUBTYPE_EXTENSIONS.get(subtype)
+            if extension:
+                return extension
         
         # Fallback based on stream type
         if stream_type == 'audio' and not includes_video:
@@ -104,10 +260,10 @@ class FileHelper:
             True if file was cleaned up successfully
         """
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.debug(f"Cleaned up file: {file_path}")
-                return True
+            os.remove(file_path)
+            logger.debug(f"Cleaned up file: {file_path}")
+            return True
+        except FileNotFoundError:
             return False
         except Exception as e:
             logger.warning(f"Failed to cleanup file {file_path}: {e}")
@@ -125,21 +281,51 @@ class FileHelper:
             File size string (e.g., "25.4 MB")
         """
         try:
-            if os.path.exists(file_path):
-                size_bytes = os.path.getsize(file_path)
-                size_mb = size_bytes / (1024 * 1024)
-                
-                if size_mb >= 1024:
-                    size_gb = size_mb / 1024
-                    return f"{size_gb:.1f} GB"
-                elif size_mb >= 1:
-                    return f"{size_mb:.1f} MB"
-                else:
-                    size_kb = size_bytes / 1024
-                    return f"{size_kb:.1f} KB"
-            return "Unknown size"
-        except Exception:
+            size_bytes = os.path.getsize(file_path)
+        except OSError:
             return "Unknown size"
+        
+        # Integer comparisons pick the unit; only the shown value is divided
+        if size_bytes >= 1 << 30:
+            return f"{size_bytes / (1 << 30):.1f} GB"
+        elif size_bytes >= 1 << 20:
+            return f"{size_bytes / (1 << 20):.1f} MB"
+        elif size_bytes >= 1 << 10:
+            return f"{size_bytes / (1 << 10):.1f} KB"
+        return f"{size_bytes} B"
+    
+    @staticmethod
+    def has_content(file_path: str) -> bool:
+        """
+        Check that a file exists and is not empty, using one stat call.
+        
+        Args:
+            file_path: Path to check
+            
+        Returns:
+            True if the file exists and has at least one byte
+        """
+        try:
+            return os.path.getsize(file_path) > 0
+        except OSError:
+            return False
+    
+    @staticmethod
+    def is_executable_file(file_path: str) -> bool:
+        """
+        Check that a path is a regular file with an execute bit, using one stat call.
+        
+        Args:
+            file_path: Path to check
+            
+        Returns:
+            True if the file exists and can be executed
+        """
+        try:
+            mode = os.stat(file_path).st_mode
+        except OSError:
+            return False
+        return stat.S_ISREG(mode) and bool(mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH))
 
 
 class URLHelper:
@@ -148,7 +334,7 @@ class URLHelper:
     @staticmethod
     def extract_youtube_video_id(url: str) -> Optional[str]:
         """
-        Extract YouTube video ID from various URL formats.
+        Extract YouTube video ID from various URL formats (or a bare ID).
         
         Args:
             url: YouTube URL
@@ -156,24 +342,12 @@ class URLHelper:
         Returns:
             Video ID if found, None otherwise
         """
-        # Common YouTube URL patterns
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',  # Standard watch URLs
-            r'(?:embed\/)([0-9A-Za-z_-]{11})',   # Embed URLs
-            r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})', # Short URLs
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        return None
+        return _youtube_video_id(url)
     
     @staticmethod
     def is_valid_youtube_url(url: str) -> bool:
         """
-        Validate if URL is a valid YouTube URL.
+        Validate if URL is a valid YouTube URL (a bare video ID also counts).
         
         Args:
             url: URL to validate
@@ -181,8 +355,12 @@ class URLHelper:
         Returns:
             True if valid YouTube URL
         """
+        # Bare IDs (already parsed by the frontend) skip URL parsing entirely
+        if len(url) == 11 and YOUTUBE_BARE_ID_PATTERN.fullmatch(url):
+            return True
+        
         try:
-            parsed = urlparse(url)
+            parsed = _parsed(url)
             
             # Check domain
             valid_domains = ['youtube.com', 'www.youtube.com', 'youtu.be', 'www.youtu.be']
@@ -190,8 +368,7 @@ class URLHelper:
                 return False
             
             # Check if we can extract video ID
-            video_id = URLHelper.extract_youtube_video_id(url)
-            return video_id is not None
+            return _youtube_video_id(url) is not None
             
         except Exception:
             return False
@@ -207,9 +384,13 @@ class URLHelper:
         Returns:
             Normalized YouTube URL
         """
-        video_id = URLHelper.extract_youtube_video_id(url)
+        # Already canonical (prefix + 11-character ID): nothing to rebuild
+        if len(url) == CANONICAL_WATCH_URL_LENGTH and url.startswith(CANONICAL_WATCH_URL_PREFIX):
+            return url
+        
+        video_id = _youtube_video_id(url)
         if video_id:
-            return f"https://www.youtube.com/watch?v={video_id}"
+            return f"{CANONICAL_WATCH_URL_PREFIX}{video_id}"
         return url
 
 
@@ -229,8 +410,7 @@ class QualityHelper:
         """
         if not resolution_str:
             return 0
-        match = re.search(r'(\d+)', str(resolution_str))
-        return int(match.group(1)) if match else 0
+        return first_number(resolution_str)
     
     @staticmethod
     def extract_audio_bitrate(abr_str: str) -> int:
@@ -245,8 +425,7 @@ class QualityHelper:
         """
         if not abr_str:
             return 0
-        match = re.search(r'(\d+)', str(abr_str))
-        return int(match.group(1)) if match else 0
+        return first_number(abr_str)
     
     @staticmethod
     def calculate_quick_video_score(resolution_str: str, fps: int = 30) -> int:
@@ -260,28 +439,16 @@ class QualityHelper:
         Returns:
             Quality score
         """
-        score = 0
         res_num = QualityHelper.extract_resolution_number(resolution_str)
         
-        # Base resolution score
-        if res_num >= 2160:
-            score += 1000  # 4K
-        elif res_num >= 1440:
-            score += 800   # 1440p
-        elif res_num >= 1080:
-            score += 600   # 1080p
-        elif res_num >= 720:
-            score += 400   # 720p
-        elif res_num >= 480:
-            score += 200   # 480p
-        else:
-            score += res_num // 10
+        # Base resolution score (bisect over the shared scoring table)
+        score = QualityScores.video_score_for(res_num)
         
         # FPS bonus
         if fps >= 60:
-            score += 50
+            score += FPS_BONUS[60]
         elif fps >= 30:
-            score += 25
+            score += FPS_BONUS[30]
         
         return score
     
@@ -296,21 +463,8 @@ class QualityHelper:
         Returns:
             Quality score
         """
-        score = 0
         bitrate = QualityHelper.extract_audio_bitrate(abr_str)
-        
-        if bitrate >= 320:
-            score += 300
-        elif bitrate >= 256:
-            score += 250
-        elif bitrate >= 192:
-            score += 200
-        elif bitrate >= 128:
-            score += 150
-        else:
-            score += bitrate
-        
-        return score
+        return QualityScores.audio_score_for(bitrate)
     
     @staticmethod
     def estimate_file_size_mb(bitrate_kbps: int, duration_seconds: int) -> float:
@@ -343,12 +497,27 @@ class ValidationHelper:
         Returns:
             True if valid stream ID format
         """
-        try:
-            # Stream IDs should be numeric
-            int(stream_id)
-            return True
-        except ValueError:
-            return False
+        # Stream IDs are itags: ASCII digit strings (isascii rules out digits like '²')
+        return isinstance(stream_id, str) and stream_id.isascii() and stream_id.isdigit()
+    
+    @staticmethod
+    def is_valid_email(email: str) -> bool:
+        """
+        Check basic email structure: local@domain.tld without whitespace.
+        
+        Uses C-level string operations instead of a regular expression.
+        
+        Args:
+            email: Email address to validate
+            
+        Returns:
+            True if the address has exactly one '@', a non-empty local part,
+            and a dot inside the domain
+        """
+        if email.split() != [email]:
+            return False  # Empty or contains whitespace
+        local, _, domain = email.partition('@')
+        return bool(local) and '@' not in domain and '.' in domain[1:-1]
     
     @staticmethod
     def sanitize_filename(filename: str) -> str:
@@ -361,13 +530,8 @@ class ValidationHelper:
         Returns:
             Sanitized filename
         """
-        # Remove or replace invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        
-        # Remove control characters
-        filename = ''.join(char for char in filename if ord(char) >= 32)
+        # Replace invalid characters and remove control characters in one pass
+        filename = filename.translate(INVALID_FILENAME_TABLE)
         
         # Limit length and trim whitespace
         filename = filename.strip()[:100]
@@ -450,20 +614,91 @@ class ResponseHelper:
         return response
 
 
+class CompressionHelper:
+    """Helper class for pre-compressing static response bodies."""
+    
+    # Preferred content encodings, best compression first
+    PREFERRED_ENCODINGS = ("br", "gzip")
+    
+    @staticmethod
+    def compress_variants(body: bytes) -> Dict[str, bytes]:
+        """
+        Pre-compress a response body with every supported encoding.
+        
+        Args:
+            body: Uncompressed response body
+            
+        Returns:
+            Dictionary mapping content encoding ('identity', 'gzip', 'br') to body bytes
+        """
+        variants = {
+            'identity': body,
+            'gzip': gzip.compress(body, compresslevel=9)
+        }
+        if brotli is not None:
+            variants['br'] = brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+        return variants
+    
+    @staticmethod
+    def select_encoding(accept_encoding: str, variants: Dict[str, bytes]) -> str:
+        """
+        Pick the best available encoding the client accepts.
+        
+        Args:
+            accept_encoding: Value of the request's Accept-Encoding header
+            variants: Pre-compressed variants from compress_variants()
+            
+        Returns:
+            Content encoding key into variants ('identity' if nothing matches)
+        """
+        accept_encoding = accept_encoding.lower()
+        for encoding in CompressionHelper.PREFERRED_ENCODINGS:
+            if encoding in variants and encoding in accept_encoding:
+                return encoding
+        return 'identity'
+
+
 # Convenience functions
 def create_temp_directory(prefix: str = "ytdl_") -> str:
-    """Create a temporary directory with given prefix."""
-    return tempfile.mkdtemp(prefix=prefix)
+    """Create a temporary directory with given prefix under the shared temp root."""
+    return tempfile.mkdtemp(prefix=prefix, dir=settings.get_temp_root())
 
 
 def cleanup_temp_directory(temp_dir: str) -> bool:
     """Cleanup temporary directory and all contents."""
-    import shutil
     try:
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-            return True
+        shutil.rmtree(temp_dir)
+        return True
+    except FileNotFoundError:
         return False
     except Exception as e:
         logger.error(f"Failed to cleanup temp directory {temp_dir}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def sweep_stale_files(directory: str, max_age: float) -> int:
+    """
+    Remove files in a directory not modified for max_age seconds.
+    
+    Args:
+        directory: Directory to sweep (not recursive)
+        max_age: Age in seconds after which a file is removed
+        
+    Returns:
+        Number of files removed
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError as e:
+                    # Gone already, or still open on platforms that lock open files
+                    logger.debug(f"Skipped sweeping {entry.path}: {e}")
+    except FileNotFoundError:
+        pass
+    return removed